@@ -0,0 +1,96 @@
+import time
+
+from PyQt6.QtCore import QThread, pyqtSignal
+from PyQt6.QtWidgets import *
+
+from validation import validate_files
+
+
+class BatchValidationThread(QThread):
+    result = pyqtSignal(object)
+
+    def __init__(self, schema, paths, workspace=None, parent=None):
+        super().__init__(parent)
+        self.schema = schema
+        self.paths = paths
+        self.workspace = workspace
+
+    def run(self):
+        results = validate_files(self.schema, self.paths, workspace=self.workspace)
+        try:
+            for result in results:
+                if self.isInterruptionRequested():
+                    break
+                self.result.emit(result)
+        finally:
+            results.close()
+
+
+class BatchValidationDialog(QDialog):
+    def __init__(self, schema, paths, parent=None, workspace=None):
+        super().__init__(parent=parent)
+        self.setWindowTitle("Validate folder")
+        layout = QVBoxLayout()
+        self.summary = QLabel()
+        layout.addWidget(self.summary)
+        self.progress = QProgressBar()
+        self.progress.setRange(0, len(paths))
+        layout.addWidget(self.progress)
+        self.table = QTableWidget(0, 4)
+        self.table.setHorizontalHeaderLabels(
+            ["File", "Result", "Errors", "First error path"])
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.table)
+        self.button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Cancel)
+        self.button_box.rejected.connect(self.reject)
+        layout.addWidget(self.button_box)
+        self.setLayout(layout)
+        screen_size = self.screen().size()
+        self.resize(round(0.5 * screen_size.width()), round(0.5 * screen_size.height()))
+
+        self.n_files = len(paths)
+        self.n_passed = 0
+        self.n_failed = 0
+        self.start_time = time.perf_counter()
+        self.thread_ = BatchValidationThread(schema, paths, workspace, self)
+        self.thread_.result.connect(self.add_result)
+        self.thread_.finished.connect(self.validation_finished)
+        self.thread_.start()
+        self.update_summary()
+
+    def add_result(self, result):
+        if result.valid:
+            self.n_passed += 1
+            text = "Pass"
+        elif result.valid is None:
+            self.n_failed += 1
+            text = "Unreadable"
+        else:
+            self.n_failed += 1
+            text = "Fail"
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+        for j, value in enumerate(
+                [result.path, text, result.n_errors, result.first_error_path]):
+            cell = QTableWidgetItem(str(value))
+            cell.setToolTip(result.first_error)
+            self.table.setItem(row, j, cell)
+        self.progress.setValue(self.progress.value() + 1)
+        self.update_summary()
+
+    def update_summary(self):
+        n_done = self.n_passed + self.n_failed
+        speed = n_done / max(time.perf_counter() - self.start_time, 1e-6)
+        self.summary.setText(
+            f"{n_done}/{self.n_files} files, {self.n_passed} passed, "
+            f"{self.n_failed} failed, {speed:.0f} files/s")
+
+    def validation_finished(self):
+        self.table.resizeColumnsToContents()
+        self.button_box.setStandardButtons(QDialogButtonBox.StandardButton.Close)
+
+    def reject(self):
+        if self.thread_.isRunning():
+            self.thread_.requestInterruption()
+            self.thread_.wait()
+        super().reject()
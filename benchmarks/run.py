@@ -0,0 +1,277 @@
+import argparse
+import datetime
+import gc
+import importlib.metadata
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")  # headless by default
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synthetic import SHAPES, generate, last_pointer
+
+# Sizes are numbers of properties, or of levels for deep
+DEFAULT_SIZES = {
+    "wide": (1000, 10000, 100000),
+    "deep": (50, 200, 500),
+    "array": (300, 3000, 30000),
+    "description": (1000, 10000, 50000),
+}
+# Differences below this are noise rather than regressions
+MIN_TIME_DIFFERENCE = 0.001  # seconds
+MIN_MEMORY_DIFFERENCE = 64 * 1024  # bytes
+
+
+class Case:
+    def __init__(self, editor, shape, size, seed, directory):
+        self.editor = editor
+        self.shape = shape
+        self.size = size
+        self.schema, self.instance = generate(shape, size, seed)
+        self.text = json.dumps(self.schema, indent=4, ensure_ascii=False)
+        self.pointer = last_pointer(self.schema)
+        self.path = os.path.join(directory, f"{shape}_{size}.json")
+
+    def show(self):
+        # The schema in the tree, as after opening it
+        self.editor.schema = self.schema
+        self.editor.refresh_tree()
+
+
+# Each operation prepares a case and returns the function to measure
+
+def parse(case):
+    data = case.text.encode("utf-8")
+    return lambda: json.loads(data.decode("utf-8"))
+
+
+def refresh_tree(case):
+    return case.show
+
+
+def node_at(case):
+    # The last node, which the lazy tree has not created yet
+    case.show()
+    return lambda: case.editor.model.node_at(case.pointer)
+
+
+def search_index(case):
+    from search_index import SearchIndex
+
+    return lambda: SearchIndex().build(case.schema)
+
+
+def validate_schema(case):
+    case.editor.live = None
+    return case.editor._validate_schema
+
+
+def validate_data(case):
+    from validation import ValidatorCache
+
+    def run():
+        validator, _ = ValidatorCache().get(case.schema, 0)
+        return list(validator.iter_errors(case.instance))
+    return run
+
+
+def hash_schema(case):
+    from schema_hash import SchemaHashes
+
+    return lambda: SchemaHashes().digest(case.schema)
+
+
+def dump(case):
+    from schema_io import dump_schema
+
+    return lambda: dump_schema(case.schema, io.StringIO())
+
+
+def save(case):
+    from schema_io import write_atomic
+
+    return lambda: write_atomic(case.path, case.schema)
+
+
+OPERATIONS = {
+    "parse": parse,
+    "refresh_tree": refresh_tree,
+    "node_at": node_at,
+    "search_index": search_index,
+    "hash": hash_schema,
+    "validate_schema": validate_schema,
+    "validate_data": validate_data,
+    "dump": dump,
+    "save": save,
+}
+
+
+def count_nodes(schema):
+    from schema_model import schema_entries
+
+    n = 0
+    stack = [(schema, True)]
+    while stack:
+        schema, root = stack.pop()
+        n += 1
+        stack.extend((s, False) for _, s in schema_entries(schema, root))
+    return n
+
+
+def measure(operation, case, repeat, memory):
+    # The best time of the repeats, and the peak of memory allocated by Python
+    # during a separate run, as tracing slows it down
+    times = []
+    for _ in range(repeat):
+        run = operation(case)
+        gc.collect()
+        t = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - t)
+    result = {"time": min(times), "median": sorted(times)[len(times) // 2]}
+    if memory:
+        run = operation(case)
+        gc.collect()
+        tracemalloc.start()
+        try:
+            start = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            run()
+            result["peak"] = tracemalloc.get_traced_memory()[1] - start
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def regression(result, baseline, threshold):
+    # Returns the description of the regression, or None
+    changes = []
+    if result["time"] > baseline["time"] * threshold and \
+            result["time"] - baseline["time"] > MIN_TIME_DIFFERENCE:
+        changes.append(f"time x{result['time'] / baseline['time']:.2f}")
+    if "peak" in result and "peak" in baseline and \
+            result["peak"] > baseline["peak"] * threshold and \
+            result["peak"] - baseline["peak"] > MIN_MEMORY_DIFFERENCE:
+        changes.append(f"memory x{result['peak'] / max(baseline['peak'], 1):.2f}")
+    return ", ".join(changes) or None
+
+
+def metadata():
+    try:
+        commit = subprocess.run(
+            ["git", "describe", "--always", "--dirty"], cwd=ROOT,
+            capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    from PyQt6.QtCore import QT_VERSION_STR
+
+    return {
+        "commit": commit,
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "qt": QT_VERSION_STR,
+        "jsonschema": importlib.metadata.version("jsonschema"),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Measure the editor on synthetic schemas. Times are the best "
+                    "of the repeats, and memory is the peak allocated by Python.")
+    parser.add_argument("--shapes", nargs="+", choices=SHAPES, default=list(SHAPES))
+    parser.add_argument("--sizes", nargs="+", type=int,
+                        help="sizes of every shape instead of the defaults")
+    parser.add_argument("--operations", nargs="+", choices=list(OPERATIONS),
+                        default=list(OPERATIONS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip the runs which measure memory")
+    parser.add_argument("--save", metavar="FILE", help="write the results as a baseline")
+    parser.add_argument("--compare", metavar="FILE",
+                        help="compare with a baseline, exiting with 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="ratio to the baseline which is a regression")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"Baseline of {baseline['metadata']['commit']} "
+              f"({baseline['metadata']['date']})")
+
+    from PyQt6.QtWidgets import QApplication
+    from main import SchemaEditor
+
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 20000))  # deep schemas
+    app = QApplication.instance() or QApplication([])
+    editor = SchemaEditor()
+    # The cases are edited in place and never saved, so new_file() and close()
+    # don't ask to save them
+    editor.confirm_discard = lambda: True
+    editor.show()
+    results = {}
+    regressions = []
+    print(f"{'shape':<12}{'size':>8}{'nodes':>9}  {'operation':<16}"
+          f"{'time (ms)':>12}{'peak (KiB)':>12}  baseline")
+    with tempfile.TemporaryDirectory() as directory:
+        for shape in args.shapes:
+            for size in args.sizes or DEFAULT_SIZES[shape]:
+                try:
+                    case = Case(editor, shape, size, args.seed, directory)
+                except RecursionError:
+                    print(f"{shape:<12}{size:>8}  too deep to generate")
+                    continue
+                nodes = count_nodes(case.schema)
+                for name in args.operations:
+                    key = f"{shape}/{size}/{name}"
+                    try:
+                        result = measure(OPERATIONS[name], case, args.repeat,
+                                         not args.no_memory)
+                    except RecursionError:
+                        print(f"{shape:<12}{size:>8}{nodes:>9}  {name:<16}"
+                              f"{'RecursionError':>24}")
+                        results[key] = {"error": "RecursionError"}
+                        continue
+                    result["nodes"] = nodes
+                    results[key] = result
+                    comparison = ""
+                    if key in baseline.get("results", {}):
+                        base = baseline["results"][key]
+                        if "time" in base:
+                            comparison = f"x{result['time'] / max(base['time'], 1e-9):.2f}"
+                            change = regression(result, base, args.threshold)
+                            if change is not None:
+                                regressions.append(f"{key}: {change}")
+                                comparison += " REGRESSION"
+                    peak = f"{result['peak'] / 1024:,.0f}" if "peak" in result else "-"
+                    print(f"{shape:<12}{size:>8}{nodes:>9}  {name:<16}"
+                          f"{result['time'] * 1000:>12,.2f}{peak:>12}  {comparison}",
+                          flush=True)
+                editor.new_file()  # release the tree of the case
+    editor.close()
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"metadata": metadata(), "results": results}, f, indent=4)
+        print(f"Saved the baseline to {args.save}")
+    if regressions:
+        print(f"{len(regressions)} regressions beyond x{args.threshold}:")
+        print("\n".join(regressions))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,158 @@
+import argparse
+import json
+import os
+import random
+
+SHAPES = ("wide", "deep", "array", "description")
+DRAFT_7 = "http://json-schema.org/draft-07/schema#"
+WORDS = (
+    "account address amount billing city code country currency customer date "
+    "delivery discount email identifier invoice item language line message name "
+    "number order payment phone price product quantity reference region status "
+    "street tax total unit user value weight zone"
+).split()
+
+
+def scalar_schema(rng):
+    # A new dict every time, as the editor keys some state by the identity of dicts
+    match rng.randrange(5):
+        case 0:
+            return {"type": "string", "maxLength": 64}
+        case 1:
+            return {"type": "integer", "minimum": 0}
+        case 2:
+            return {"type": "number"}
+        case 3:
+            return {"type": "boolean"}
+        case _:
+            return {"type": "string", "enum": rng.sample(WORDS, 3)}
+
+
+def sentence(rng, n_words):
+    return " ".join(rng.choice(WORDS) for _ in range(n_words)).capitalize() + "."
+
+
+def object_schema(properties, required=()):
+    return {"type": "object", "properties": properties, "required": list(required)}
+
+
+def wide_schema(size, rng):
+    # size sibling properties of the root
+    return object_schema({f"field_{i}": scalar_schema(rng) for i in range(size)})
+
+
+def deep_schema(size, rng):
+    # size levels of nested objects, with a scalar beside each level
+    schema = {"type": "string"}
+    for i in reversed(range(size)):
+        schema = object_schema({"name": scalar_schema(rng), f"level_{i + 1}": schema},
+                               ["name"])
+    return schema
+
+
+def array_schema(size, rng):
+    # size arrays of objects which contain arrays
+    properties = {}
+    for i in range(size):
+        element = object_schema({
+            "id": {"type": "integer"},
+            "values": {"type": "array", "items": scalar_schema(rng), "maxItems": 16},
+        }, ["id"])
+        properties[f"list_{i}"] = {"type": "array", "items": element}
+    return object_schema(properties)
+
+
+def description_schema(size, rng):
+    # size properties with a title and a description of a few sentences
+    properties = {}
+    for i in range(size):
+        schema = scalar_schema(rng)
+        schema["title"] = sentence(rng, 4)[:-1]
+        schema["description"] = " ".join(
+            sentence(rng, rng.randint(8, 20)) for _ in range(rng.randint(2, 6)))
+        properties[f"field_{i}"] = schema
+    return object_schema(properties)
+
+
+GENERATORS = {
+    "wide": wide_schema,
+    "deep": deep_schema,
+    "array": array_schema,
+    "description": description_schema,
+}
+
+
+def instance_of(schema, rng, n_items=3):
+    # Data which fits a schema of the generators
+    stack = []
+    root = [None]
+    stack.append((schema, root, 0))
+    while stack:
+        schema, container, key = stack.pop()
+        match schema.get("type"):
+            case "object":
+                value = {}
+                for name, subschema in schema["properties"].items():
+                    value[name] = None
+                    stack.append((subschema, value, name))
+            case "array":
+                value = [None] * rng.randint(1, n_items)
+                for i in range(len(value)):
+                    stack.append((schema["items"], value, i))
+            case "string" if "enum" in schema:
+                value = rng.choice(schema["enum"])
+            case "string":
+                value = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4)))
+            case "integer":
+                value = rng.randrange(1000)
+            case "number":
+                value = round(rng.uniform(0, 1000), 2)
+            case _:
+                value = rng.random() < 0.5
+        container[key] = value
+    return root[0]
+
+
+def last_pointer(schema):
+    # JSON pointer of the last node of the tree, e.g. the deepest level
+    pointer = ""
+    while True:
+        if schema.get("type") == "object" and schema["properties"]:
+            key, schema = list(schema["properties"].items())[-1]
+            pointer += "/properties/" + key
+        elif schema.get("type") == "array" and pointer:  # root shows properties only
+            schema = schema["items"]
+            pointer += "/items"
+        else:
+            return pointer
+
+
+def generate(shape, size, seed=0):
+    # Returns the schema and matching data, the same for the same seed
+    rng = random.Random(f"{shape} {size} {seed}")
+    schema = {"$schema": DRAFT_7, **GENERATORS[shape](size, rng)}
+    return schema, instance_of(schema, rng)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Write a synthetic schema and matching data, e.g. to open in "
+                    "the editor.")
+    parser.add_argument("shape", choices=SHAPES)
+    parser.add_argument("size", type=int,
+                        help="number of properties, or of levels for deep")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=".", help="directory of the files")
+    args = parser.parse_args(argv)
+    schema, instance = generate(args.shape, args.size, args.seed)
+    os.makedirs(args.output, exist_ok=True)
+    name = f"{args.shape}_{args.size}"
+    for suffix, value in (("schema", schema), ("data", instance)):
+        path = os.path.join(args.output, f"{name}_{suffix}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(value, f, indent=4, ensure_ascii=False)
+        print(path)
+
+
+if __name__ == '__main__':
+    main()
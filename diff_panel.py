@@ -0,0 +1,61 @@
+import json
+
+from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtWidgets import *
+
+MAX_VALUE_LENGTH = 200  # characters of a value shown
+
+
+def summary(value):
+    if value is None:
+        return ""
+    text = json.dumps(value, ensure_ascii=False)
+    if len(text) > MAX_VALUE_LENGTH:
+        return text[:MAX_VALUE_LENGTH] + "..."
+    return text
+
+
+class DiffPanel(QDockWidget):
+    # Differences of the schema in the editor from a file, by subschema. Double
+    # clicking one selects its node, or the nearest one if it isn't in the tree.
+    activated = pyqtSignal(str)  # JSON pointer of the subschema
+
+    def __init__(self, parent=None):
+        super().__init__("Differences", parent)
+        widget = QWidget()
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        widget.setLayout(layout)
+        self.label = QLabel()
+        self.label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        layout.addWidget(self.label)
+        self.tree = QTreeWidget()
+        self.tree.setHeaderLabels(["Subschema", "Keyword", "Change", "In file", "In editor"])
+        self.tree.setRootIsDecorated(False)
+        self.tree.setUniformRowHeights(True)
+        self.tree.itemActivated.connect(self.item_activated)
+        layout.addWidget(self.tree)
+        self.setWidget(widget)
+
+    def set_differences(self, path, differences, truncated=False):
+        # differences: as yielded by diff_schemas, from the file to the editor
+        self.tree.clear()
+        items = []
+        for pointer, keyword, change, old, new in differences:
+            item = QTreeWidgetItem([
+                pointer or "root", keyword or "", change, summary(old), summary(new)])
+            item.setData(0, Qt.ItemDataRole.UserRole, pointer)
+            items.append(item)
+        self.tree.addTopLevelItems(items)
+        for column in range(3):
+            self.tree.resizeColumnToContents(column)
+        if not differences:
+            self.label.setText(f"No differences from {path}.")
+        elif truncated:
+            self.label.setText(
+                f"The first {len(differences):,} differences from {path}.")
+        else:
+            self.label.setText(f"{len(differences):,} differences from {path}.")
+
+    def item_activated(self, item):
+        self.activated.emit(item.data(0, Qt.ItemDataRole.UserRole))
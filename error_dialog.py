@@ -0,0 +1,147 @@
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PyQt6.QtWidgets import *
+
+from validation import format_path
+
+BATCH_SIZE = 500
+
+
+def path_key(path):
+    # Indices and field names at the same depth are not comparable
+    return [(isinstance(p, str), p) for p in path]
+
+
+class ErrorTableModel(QAbstractTableModel):
+    # Rows are loaded in batches while scrolling
+    def __init__(self, records, jsonl=False, parent=None):
+        super().__init__(parent)
+        self.columns = ["Data path", "Keyword", "Message"]
+        if jsonl:
+            self.columns.insert(0, "Line")
+        self.records = records
+        self.loaded = min(BATCH_SIZE, len(records))
+
+    def set_records(self, records):
+        self.beginResetModel()
+        self.records = records
+        self.loaded = min(BATCH_SIZE, len(records))
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.loaded
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.columns)
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and self.loaded < len(self.records)
+
+    def fetchMore(self, parent):
+        n = min(BATCH_SIZE, len(self.records) - self.loaded)
+        self.beginInsertRows(QModelIndex(), self.loaded, self.loaded + n - 1)
+        self.loaded += n
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role not in (
+                Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            return None
+        record = self.records[index.row()]
+        match self.columns[index.column()]:
+            case "Line":
+                return record.line
+            case "Data path":
+                return format_path(record.path)
+            case "Keyword":
+                return record.keyword
+            case "Message":
+                return record.message
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.columns[section]
+        return section + 1
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        if column < 0:  # the order of iter_errors()
+            return
+        match self.columns[column]:
+            case "Line":
+                key = lambda r: (r.line or 0, path_key(r.path))
+            case "Data path":
+                key = lambda r: path_key(r.path)
+            case "Keyword":
+                key = lambda r: r.keyword
+            case _:
+                key = lambda r: r.message
+        self.set_records(sorted(
+            self.records, key=key,
+            reverse=order == Qt.SortOrder.DescendingOrder))
+
+
+class ErrorReportDialog(QDialog):
+    def __init__(self, report, summary, jsonl=False, parent=None):
+        super().__init__(parent=parent)
+        self.setWindowTitle("Validator")
+        self.report = report
+        layout = QVBoxLayout()
+        if report.truncated:
+            summary += f" Stopped after {len(report.records):,} errors."
+        layout.addWidget(QLabel(summary))
+
+        splitter = QSplitter(Qt.Orientation.Vertical)
+        # Groups are few, so a widget is enough
+        groups = sorted(report.groups.items(), key=lambda g: -len(g[1]))
+        self.groups = QTableWidget(len(groups), 3)
+        self.groups.setHorizontalHeaderLabels(["Schema path", "Keyword", "Errors"])
+        self.groups.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.groups.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.groups.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.group_records = []
+        for row, ((schema_path, keyword), records) in enumerate(groups):
+            item = QTableWidgetItem(format_path(schema_path, "schema"))
+            item.setData(Qt.ItemDataRole.UserRole, row)
+            self.groups.setItem(row, 0, item)
+            self.groups.setItem(row, 1, QTableWidgetItem(keyword))
+            count = QTableWidgetItem()
+            count.setData(Qt.ItemDataRole.DisplayRole, len(records))
+            self.groups.setItem(row, 2, count)
+            self.group_records.append(records)
+        self.groups.setSortingEnabled(True)
+        self.groups.resizeColumnsToContents()
+        self.groups.itemSelectionChanged.connect(self.select_group)
+        splitter.addWidget(self.groups)
+
+        self.model = ErrorTableModel(report.records, jsonl, self)
+        self.errors = QTableView()
+        self.errors.setModel(self.model)
+        self.errors.setWordWrap(False)
+        self.errors.horizontalHeader().setStretchLastSection(True)
+        # Sorted only when the user clicks a header
+        self.errors.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        self.errors.setSortingEnabled(True)
+        self.errors.resizeColumnsToContents()
+        splitter.addWidget(self.errors)
+        splitter.setStretchFactor(1, 3)
+        layout.addWidget(splitter)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+        self.setLayout(layout)
+        screen_size = self.screen().size()
+        self.resize(round(0.5 * screen_size.width()), round(0.6 * screen_size.height()))
+
+    def select_group(self):
+        rows = self.groups.selectionModel().selectedRows()
+        if rows:
+            group = self.groups.item(rows[0].row(), 0).data(Qt.ItemDataRole.UserRole)
+            records = self.group_records[group]
+        else:
+            records = self.report.records
+        header = self.errors.horizontalHeader()
+        self.model.set_records(records)
+        self.model.sort(header.sortIndicatorSection(), header.sortIndicatorOrder())
@@ -0,0 +1,105 @@
+import os
+
+from PyQt6.QtCore import QThread, pyqtSignal
+from PyQt6.QtWidgets import *
+
+from instance_generator import DEFAULT_VIOLATIONS, VIOLATIONS
+
+MAX_RECORDS = 2_000_000_000
+
+
+class GenerateOptionsDialog(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+        self.setWindowTitle("Generate data")
+        layout = QFormLayout()
+        self.count = QSpinBox()
+        self.count.setRange(1, MAX_RECORDS)
+        self.count.setValue(1000)
+        self.count.setGroupSeparatorShown(True)
+        layout.addRow("Records:", self.count)
+        self.seed = QSpinBox()
+        self.seed.setRange(0, 2 ** 31 - 1)
+        self.seed.setToolTip("The same seed generates the same records.")
+        layout.addRow("Seed:", self.seed)
+        self.invalid_percent = QDoubleSpinBox()
+        self.invalid_percent.setRange(0, 100)
+        self.invalid_percent.setDecimals(2)
+        self.invalid_percent.setSuffix(" %")
+        self.invalid_percent.setToolTip("Records with one violation of the schema")
+        layout.addRow("Invalid records:", self.invalid_percent)
+        violations = QGridLayout()
+        self.violation_boxes = {}
+        for i, kind in enumerate(VIOLATIONS):
+            box = QCheckBox(kind)
+            box.setChecked(kind in DEFAULT_VIOLATIONS)
+            self.violation_boxes[kind] = box
+            violations.addWidget(box, i // 4, i % 4)
+        self.violation_boxes["format"].setToolTip(
+            "Formats are not checked when data is validated.")
+        layout.addRow("Violations:", violations)
+        self.processes = QSpinBox()
+        self.processes.setRange(1, os.cpu_count() or 1)
+        self.processes.setValue(os.cpu_count() or 1)
+        layout.addRow("Processes:", self.processes)
+        button_box = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel
+        )
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        layout.addRow(button_box)
+        self.setLayout(layout)
+
+    def invalid_rate(self):
+        return self.invalid_percent.value() / 100
+
+    def violations(self):
+        return [kind for kind, box in self.violation_boxes.items() if box.isChecked()]
+
+
+class GenerateThread(QThread):
+    progress = pyqtSignal(int)  # records written
+
+    def __init__(self, generator, path, count, processes=None, parent=None):
+        super().__init__(parent)
+        self.generator = generator
+        self.path = path
+        self.count = count
+        self.processes = processes
+        self.n_records = 0
+        self.n_invalid = 0
+        self.error = None
+
+    def run(self):
+        try:
+            with open(self.path, "wb") as f:
+                written = self.generator.write(f, self.count, self.processes)
+                try:
+                    for self.n_records, self.n_invalid in written:
+                        self.progress.emit(self.n_records)
+                        if self.isInterruptionRequested():
+                            return
+                finally:
+                    written.close()
+        except (OSError, ValueError) as e:
+            self.error = str(e)
+
+
+class GenerateProgressDialog(QProgressDialog):
+    def __init__(self, generator, path, count, processes=None, parent=None):
+        super().__init__(parent=parent)
+        self.setWindowTitle("Generate data")
+        self.setLabelText("Generating...")
+        self.setRange(0, count)
+        self.setMinimumDuration(0)
+        self.setAutoClose(False)
+        self.setAutoReset(False)
+        self.thread_ = GenerateThread(generator, path, count, processes, self)
+        self.thread_.progress.connect(self.update_progress)
+        self.thread_.finished.connect(self.accept)
+        self.canceled.connect(self.thread_.requestInterruption)
+        self.thread_.start()
+
+    def update_progress(self, n_records):
+        self.setValue(n_records)
+        self.setLabelText(f"{n_records:,} records")
@@ -0,0 +1,113 @@
+import sys
+from collections import deque
+from contextlib import contextmanager
+
+DEFAULT_BUDGET = 64 * 1024 * 1024  # bytes
+
+
+def approximate_size(value):
+    # Subschemas shared with the current schema are counted as well
+    size = sys.getsizeof(value)
+    stack = [value]
+    while stack:
+        v = stack.pop()
+        if isinstance(v, dict):
+            items = [*v.keys(), *v.values()]
+        elif isinstance(v, (list, tuple)):
+            items = v
+        else:
+            continue
+        for item in items:
+            size += sys.getsizeof(item)
+            stack.append(item)
+    return size
+
+
+class History:
+    # Undo and redo stacks of edits. An edit is kept as the inverse operations
+    # of its changes, (method name of SchemaModel, JSON pointer, *arguments),
+    # which refer to the replaced values instead of copying the schema.
+    def __init__(self, budget=DEFAULT_BUDGET):
+        self.budget = budget  # the latest edit is kept even if it is larger
+        self.undo_stack = deque()  # (label, operations, size)
+        self.redo_stack = []
+        self.size = 0
+        self.depth = 0
+        self.label = None
+        self.operations = None  # of the edit being recorded
+        self.replaying = None  # "undo" or "redo"
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.size = 0
+
+    @contextmanager
+    def edit(self, label):
+        # Changes inside are undone together; nested edits join the outer one
+        if self.depth == 0:
+            self.label = label
+            self.operations = []
+        self.depth += 1
+        try:
+            yield
+        finally:
+            self.depth -= 1
+            if self.depth == 0:
+                operations, self.operations = self.operations, None
+                if operations:
+                    self._push(self.label, operations)
+
+    def record(self, *operation):
+        if self.operations is None:
+            with self.edit("Edit"):
+                self.operations.append(operation)
+        else:
+            self.operations.append(operation)
+
+    def _push(self, label, operations):
+        entry = (label, operations, approximate_size(operations))
+        self.size += entry[2]
+        if self.replaying == "undo":
+            self.redo_stack.append(entry)
+            return
+        if self.replaying is None:
+            self.size -= sum(size for _, _, size in self.redo_stack)
+            self.redo_stack.clear()
+        self.undo_stack.append(entry)
+        while self.size > self.budget and len(self.undo_stack) > 1:
+            self.size -= self.undo_stack.popleft()[2]
+
+    def undo_label(self):
+        return self.undo_stack[-1][0] if self.undo_stack else None
+
+    def redo_label(self):
+        return self.redo_stack[-1][0] if self.redo_stack else None
+
+    def undo(self, model):
+        # Returns the label of the edit and the pointer of the deepest changed
+        # node, or None if there is nothing to undo
+        if not self.undo_stack:
+            return None
+        return self._replay(model, self.undo_stack.pop(), "undo")
+
+    def redo(self, model):
+        if not self.redo_stack:
+            return None
+        return self._replay(model, self.redo_stack.pop(), "redo")
+
+    def _replay(self, model, entry, replaying):
+        label, operations, size = entry
+        self.size -= size
+        self.replaying = replaying
+        changed = []
+        try:
+            with self.edit(label):
+                for name, pointer, *args in reversed(operations):
+                    node = model.node_at(pointer)
+                    # A method returns the new node if it inserts one
+                    node = getattr(model, name)(node, *args) or node
+                    changed.append(node.pointer)
+        finally:
+            self.replaying = None
+        return label, max(changed, key=len)
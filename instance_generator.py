@@ -0,0 +1,720 @@
+import json
+import math
+import os
+import random
+import re
+import re._constants as sre
+import re._parser
+import string
+import uuid
+from collections import deque
+from itertools import islice
+
+# Kinds of violation which invalid records can have, named by the keyword
+VIOLATIONS = ("type", "required", "enum", "minimum", "maximum", "multipleOf",
+              "minLength", "maxLength", "pattern", "minItems", "maxItems", "format")
+# format is an annotation which the validator doesn't check
+DEFAULT_VIOLATIONS = tuple(v for v in VIOLATIONS if v != "format")
+CHUNK_RECORDS = 10_000  # generated by a worker process at a time
+OPTIONAL_RATE = 0.5  # of the optional properties which are present
+MAX_EXTRA_ITEMS = 3  # beyond minItems without maxItems
+MAX_REF_DEPTH = 64
+HONOURED_KEYWORDS = {
+    "type", "properties", "required", "items", "minItems", "maxItems", "minimum",
+    "maximum", "exclusiveMinimum", "exclusiveMaximum", "multipleOf", "minLength",
+    "maxLength", "format", "pattern", "enum", "const", "$ref", "additionalProperties",
+    "definitions", "$schema", "$id", "$comment", "title", "description", "default",
+    "examples", "readOnly", "writeOnly", "contentMediaType", "contentEncoding",
+}
+LETTERS = string.ascii_letters + string.digits
+# Strings are slices of random letters, which is faster than drawing each letter
+POOL = "".join(random.Random(0).choices(LETTERS, k=1 << 16))
+REPEAT = 3  # times beyond the minimum of an unbounded repeat in a pattern
+PRINTABLE = [chr(c) for c in range(32, 127)]
+CATEGORIES = {
+    sre.CATEGORY_DIGIT: string.digits,
+    sre.CATEGORY_NOT_DIGIT: string.ascii_letters + " _-",
+    sre.CATEGORY_WORD: LETTERS + "_",
+    sre.CATEGORY_NOT_WORD: " -.,:;",
+    sre.CATEGORY_SPACE: " ",
+    sre.CATEGORY_NOT_SPACE: LETTERS,
+}
+# A value of each type, an integer being a number as well
+JSON_TYPES = {
+    "string": "text", "number": 1.5, "integer": 7, "boolean": True, "null": None,
+    "object": {}, "array": [],
+}
+
+
+def letters(rng, n):
+    if n > len(POOL):
+        return (POOL * (n // len(POOL) + 1))[:n]
+    start = int(rng.random() * (len(POOL) - n))
+    return POOL[start:start + n]
+
+
+def between(rng, low, high):
+    # rng.randint(low, high), which is slower
+    return low + int(rng.random() * (high - low + 1))
+
+
+def random_date(rng):
+    return f"{rng.randint(1970, 2037):04}-{rng.randint(1, 12):02}-{rng.randint(1, 28):02}"
+
+
+def random_time(rng):
+    return f"{rng.randrange(24):02}:{rng.randrange(60):02}:{rng.randrange(60):02}Z"
+
+
+FORMATS = {
+    "date": random_date,
+    "time": random_time,
+    "date-time": lambda rng: random_date(rng) + "T" + random_time(rng),
+    "duration": lambda rng: f"P{rng.randint(1, 30)}DT{rng.randrange(24)}H",
+    "email": lambda rng: f"{letters(rng, 8).lower()}@example.com",
+    "hostname": lambda rng: f"{letters(rng, 8).lower()}.example.com",
+    "ipv4": lambda rng: ".".join(str(rng.randrange(256)) for _ in range(4)),
+    "ipv6": lambda rng: ":".join(f"{rng.randrange(65536):x}" for _ in range(8)),
+    "uuid": lambda rng: str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+    "uri": lambda rng: f"https://example.com/{letters(rng, 8)}",
+}
+
+
+def pattern_generator(pattern):
+    # Returns a function of the random generator which returns a string that
+    # the regular expression matches. Lookarounds and backreferences are not
+    # supported.
+    try:
+        parsed = re._parser.parse(pattern)
+    except re.error as e:
+        raise ValueError(f"Invalid pattern {pattern!r}: {e}") from None
+    return _sequence(parsed, pattern)
+
+
+def _sequence(items, pattern):
+    parts = [_regex_item(op, av, pattern) for op, av in items]
+    return lambda rng: "".join([part(rng) for part in parts])
+
+
+def _regex_item(op, av, pattern):
+    if op == sre.LITERAL:
+        c = chr(av)
+        return lambda rng: c
+    if op == sre.NOT_LITERAL:
+        chars = [c for c in LETTERS if c != chr(av)]
+        return lambda rng: rng.choice(chars)
+    if op == sre.ANY:
+        return lambda rng: rng.choice(LETTERS)
+    if op == sre.AT:
+        return lambda rng: ""
+    if op == sre.IN:
+        return _character_set(av, pattern)
+    if op == sre.BRANCH:
+        branches = [_sequence(branch, pattern) for branch in av[1]]
+        return lambda rng: rng.choice(branches)(rng)
+    if op == sre.SUBPATTERN:
+        return _sequence(av[3], pattern)
+    if op in (sre.MAX_REPEAT, sre.MIN_REPEAT, sre.POSSESSIVE_REPEAT):
+        low, high, items = av
+        if high == sre.MAXREPEAT:
+            high = low + REPEAT
+        item = _sequence(items, pattern)
+        return lambda rng: "".join([item(rng) for _ in range(rng.randint(low, high))])
+    raise ValueError(f"Cannot generate strings for the pattern {pattern!r}.")
+
+
+def _character_set(items, pattern):
+    negate = items and items[0][0] == sre.NEGATE
+    ranges = []  # (first, last) code points
+    for op, av in items[negate:]:
+        if op == sre.LITERAL:
+            ranges.append((av, av))
+        elif op == sre.RANGE:
+            ranges.append(av)
+        elif op == sre.CATEGORY and av in CATEGORIES:
+            ranges.extend((ord(c), ord(c)) for c in CATEGORIES[av])
+        else:
+            raise ValueError(f"Cannot generate strings for the pattern {pattern!r}.")
+    if negate:
+        chars = [c for c in PRINTABLE
+                 if not any(first <= ord(c) <= last for first, last in ranges)]
+        if not chars:
+            raise ValueError(f"Cannot generate strings for the pattern {pattern!r}.")
+        return lambda rng: rng.choice(chars)
+    if all(last - first < 128 for first, last in ranges):
+        chars = sorted({chr(c) for first, last in ranges for c in range(first, last + 1)})
+        return lambda rng: rng.choice(chars)
+    # Large ranges, e.g. of Unicode, by a range and then a code point
+    def character(rng):
+        while True:
+            c = rng.randint(*rng.choice(ranges))
+            if not 0xD800 <= c <= 0xDFFF:  # surrogates cannot be encoded
+                return chr(c)
+    return character
+
+
+def not_matching(regex):
+    # A string which the regular expression doesn't match, or None
+    for candidate in ("", "!", " ", "0", "a", "~~~~", "é", "A" * 300):
+        if regex.search(candidate) is None:
+            return candidate
+    return None
+
+
+class Node:
+    # Generates the values of a subschema. violate() generates a value with the
+    # violation at the route, a tuple of property names, and None or indexes for
+    # the elements of arrays.
+    typed = True  # False if the type is inferred, so any type fits
+
+    def generate(self, rng):
+        raise NotImplementedError
+
+    def violations(self):
+        # Kinds of violation of the subschema itself
+        return ["type"] if self.typed else []
+
+    def bad(self, rng, kind):
+        return self.wrong_type
+
+    def violate(self, rng, route, kind):
+        return self.bad(rng, kind)
+
+    def routes(self, seen):
+        # (route, kind) of every violation in the subschema and its descendants
+        return [((), kind) for kind in self.violations()]
+
+
+class AnyNode(Node):
+    def generate(self, rng):
+        return letters(rng, 6)
+
+    def violations(self):
+        return []
+
+
+class ConstNode(Node):
+    # Of enum or const, whose violations are both "enum"
+    def __init__(self, values):
+        self.values = values
+        self.other = next(v for v in ("not in the enum", -1.25, 12345, None, True)
+                          if v not in values)
+
+    def generate(self, rng):
+        return rng.choice(self.values)
+
+    def violations(self):
+        return ["enum"]
+
+    def bad(self, rng, kind):
+        return self.other
+
+
+class NullNode(Node):
+    wrong_type = 0
+
+    def generate(self, rng):
+        return None
+
+
+class BooleanNode(Node):
+    wrong_type = "true"
+
+    def generate(self, rng):
+        return rng.random() < 0.5
+
+
+class StringNode(Node):
+    wrong_type = 0
+
+    def __init__(self, schema):
+        self.min_length = schema.get("minLength", 0)
+        self.max_length = schema.get("maxLength")
+        high = self.min_length + 12 if self.max_length is None else \
+            min(self.max_length, self.min_length + 12)
+        self.lengths = (max(self.min_length, min(4, high)), high)
+        self.format = schema.get("format")
+        self.pattern = schema.get("pattern")
+        if self.pattern is not None:
+            self.value = pattern_generator(self.pattern)
+            self.non_matching = not_matching(re.compile(self.pattern))
+        elif self.format in FORMATS:
+            self.value = FORMATS[self.format]
+        else:
+            low, high = self.lengths
+            self.value = lambda rng: letters(rng, between(rng, low, high))
+
+    def generate(self, rng):
+        return self.value(rng)
+
+    def violations(self):
+        kinds = super().violations()
+        if self.min_length > 0:
+            kinds.append("minLength")
+        if self.max_length is not None:
+            kinds.append("maxLength")
+        if self.pattern is not None and self.non_matching is not None:
+            kinds.append("pattern")
+        if self.format in FORMATS:
+            kinds.append("format")
+        return kinds
+
+    def bad(self, rng, kind):
+        match kind:
+            case "minLength":
+                return letters(rng, self.min_length - 1)
+            case "maxLength":
+                return letters(rng, self.max_length + 1)
+            case "pattern":
+                return self.non_matching
+            case "format":
+                return "not a " + self.format
+        return self.wrong_type
+
+
+class NumberNode(Node):
+    wrong_type = "1"
+
+    def __init__(self, schema, integer):
+        self.integer = integer
+        self.schema = schema
+        low, high = schema.get("minimum"), schema.get("maximum")
+        exclusive_low = schema.get("exclusiveMinimum")
+        exclusive_high = schema.get("exclusiveMaximum")
+        if exclusive_low is not None and (low is None or exclusive_low >= low):
+            low = exclusive_low
+        else:
+            exclusive_low = None
+        if exclusive_high is not None and (high is None or exclusive_high <= high):
+            high = exclusive_high
+        else:
+            exclusive_high = None
+        if low is None:
+            low = 0 if high is None else high - 1000
+        if high is None:
+            high = low + 1000
+        self.low, self.high = low, high
+        self.exclusive_low = exclusive_low is not None
+        self.exclusive_high = exclusive_high is not None
+        self.multiple = schema.get("multipleOf")
+        if integer:
+            self.first = math.floor(low) + 1 if self.exclusive_low else math.ceil(low)
+            self.last = math.ceil(high) - 1 if self.exclusive_high else math.floor(high)
+            if self.first > self.last:
+                raise ValueError(f"No integer is between {low} and {high}.")
+        if self.multiple is not None:
+            self.multiples = (math.ceil(low / self.multiple),
+                              math.floor(high / self.multiple))
+            if self.multiples[0] > self.multiples[1]:
+                raise ValueError(
+                    f"No multiple of {self.multiple} is between {low} and {high}.")
+
+    def fits(self, value):
+        if value < self.low or value > self.high or \
+                (self.exclusive_low and value == self.low) or \
+                (self.exclusive_high and value == self.high):
+            return False
+        if self.integer and value != int(value):
+            return False
+        if self.multiple is not None:  # as the validator checks it
+            quotient = value / self.multiple
+            return int(quotient) == quotient
+        return True
+
+    def generate(self, rng):
+        if self.multiple is not None:
+            for _ in range(16):
+                value = rng.randint(*self.multiples) * self.multiple
+                if self.integer:
+                    value = int(value) if value == int(value) else value
+                if self.fits(value):
+                    return value
+            raise ValueError(f"Cannot generate a multiple of {self.multiple} "
+                             f"between {self.low} and {self.high}.")
+        if self.integer:
+            return between(rng, self.first, self.last)
+        value = round(rng.uniform(self.low, self.high), 2)
+        return value if self.fits(value) else (self.low + self.high) / 2
+
+    def violations(self):
+        kinds = super().violations()
+        if "minimum" in self.schema or "exclusiveMinimum" in self.schema:
+            kinds.append("minimum")
+        if "maximum" in self.schema or "exclusiveMaximum" in self.schema:
+            kinds.append("maximum")
+        if self.multiple is not None:
+            kinds.append("multipleOf")
+        return kinds
+
+    def bad(self, rng, kind):
+        match kind:
+            case "minimum":
+                return self.low if self.exclusive_low else math.floor(self.low) - 1
+            case "maximum":
+                return self.high if self.exclusive_high else math.ceil(self.high) + 1
+            case "multipleOf":
+                return self.multiples[0] * self.multiple + self.multiple / 2
+        return self.wrong_type
+
+
+class ObjectNode(Node):
+    wrong_type = []
+
+    def __init__(self, properties):
+        self.properties = properties  # (name, node, required)
+        self.required = [name for name, _, required in properties if required]
+
+    def generate(self, rng):
+        value = {}
+        random_ = rng.random
+        for name, node, required in self.properties:
+            if required or random_() < OPTIONAL_RATE:
+                value[name] = node.generate(rng)
+        return value
+
+    def violations(self):
+        return super().violations() + (["required"] if self.required else [])
+
+    def bad(self, rng, kind):
+        if kind == "required":
+            value = self.generate(rng)
+            del value[rng.choice(self.required)]
+            return value
+        return self.wrong_type
+
+    def violate(self, rng, route, kind):
+        if not route:
+            return self.bad(rng, kind)
+        value = {}
+        for name, node, required in self.properties:
+            if name == route[0]:
+                value[name] = node.violate(rng, route[1:], kind)
+            elif required or rng.random() < OPTIONAL_RATE:
+                value[name] = node.generate(rng)
+        return value
+
+    def routes(self, seen):
+        routes = super().routes(seen)
+        for name, node, _ in self.properties:
+            routes.extend(((name, *route), kind) for route, kind in node.routes(seen))
+        return routes
+
+
+class ArrayNode(Node):
+    wrong_type = {}
+
+    def __init__(self, items, min_items, max_items):
+        self.items = items  # node of every element, or list of the first ones
+        self.min_items = min_items
+        self.max_items = max_items
+        high = min_items + MAX_EXTRA_ITEMS if max_items is None else max_items
+        if isinstance(items, list):
+            high = min(high, len(items))
+        elif items is None:  # no element is allowed
+            high = 0
+        if min_items > high:
+            raise ValueError(f"Arrays cannot have {min_items} elements.")
+        self.lengths = (min_items, high)
+
+    def element(self, i):
+        return self.items[i] if isinstance(self.items, list) else self.items
+
+    def generate(self, rng):
+        n = between(rng, *self.lengths)
+        if isinstance(self.items, list):
+            return [self.items[i].generate(rng) for i in range(n)]
+        return [self.items.generate(rng) for _ in range(n)]
+
+    def violations(self):
+        kinds = super().violations()
+        if self.min_items > 0:
+            kinds.append("minItems")
+        if self.max_items is not None and not isinstance(self.items, list) and \
+                self.items is not None:
+            kinds.append("maxItems")
+        return kinds
+
+    def bad(self, rng, kind):
+        match kind:
+            case "minItems":
+                return [self.element(i).generate(rng) for i in range(self.min_items - 1)]
+            case "maxItems":
+                return [self.items.generate(rng) for _ in range(self.max_items + 1)]
+        return self.wrong_type
+
+    def violate(self, rng, route, kind):
+        if not route:
+            return self.bad(rng, kind)
+        value = self.generate(rng)
+        if route[0] is None:  # any element
+            if not value:
+                value = [self.items.generate(rng)]
+            i = rng.randrange(len(value))
+        else:
+            i = route[0]
+            value.extend(self.items[j].generate(rng) for j in range(len(value), i + 1))
+        value[i] = self.element(i).violate(rng, route[1:], kind)
+        return value
+
+    def routes(self, seen):
+        routes = super().routes(seen)
+        if isinstance(self.items, list):
+            for i, node in enumerate(self.items):
+                routes.extend(((i, *route), kind) for route, kind in node.routes(seen))
+        elif self.items is not None and self.lengths[1] > 0:
+            routes.extend(((None, *route), kind)
+                          for route, kind in self.items.routes(seen))
+        return routes
+
+
+class UnionNode(Node):
+    # Of a list of types. Violations inside its branches are not generated.
+    def __init__(self, nodes, types):
+        self.nodes = nodes
+        self.wrong_type = next(
+            value for type_, value in JSON_TYPES.items() if type_ not in types and
+            not (type_ == "integer" and "number" in types))
+
+    def generate(self, rng):
+        return rng.choice(self.nodes).generate(rng)
+
+
+class RefNode(Node):
+    def __init__(self, compiler, ref):
+        self.compiler = compiler
+        self.ref = ref
+        self.node = None
+        self.depth = 0
+
+    def target(self):
+        if self.node is None:
+            self.node = self.compiler.compile(self.compiler.lookup(self.ref))
+        return self.node
+
+    def generate(self, rng):
+        self.depth += 1
+        try:
+            if self.depth > MAX_REF_DEPTH:
+                raise ValueError(f"$ref {self.ref} recurses too deep.")
+            return self.target().generate(rng)
+        finally:
+            self.depth -= 1
+
+    def violations(self):
+        return []
+
+    def violate(self, rng, route, kind):
+        return self.target().violate(rng, route, kind)
+
+    def routes(self, seen):
+        # Once for each $ref, as references may be cyclic
+        if self.ref in seen:
+            return []
+        seen.add(self.ref)
+        return self.target().routes(seen)
+
+
+class Compiler:
+    # Builds the nodes of a schema, once for each subschema
+    def __init__(self, root):
+        self.root = root
+        self.ignored = set()  # keywords which the generator doesn't honour
+        self.nodes = {}  # id of the subschema -> node
+
+    def lookup(self, ref):
+        if not ref.startswith("#"):
+            raise ValueError(f"Only $ref in the same schema are supported: {ref}")
+        schema = self.root
+        pointer = ref[1:].lstrip("/")
+        for token in pointer.split("/") if pointer else []:
+            token = token.replace("~1", "/").replace("~0", "~")
+            if isinstance(schema, list) and token.isdigit():
+                token = int(token)
+            try:
+                schema = schema[token]
+            except (KeyError, IndexError, TypeError):
+                raise ValueError(f"$ref {ref} isn't in the schema.") from None
+        return schema
+
+    def compile(self, schema):
+        # None for the schema false, which no value fits
+        if schema is True or schema == {}:
+            return AnyNode()
+        if schema is False:
+            return None
+        node = self.nodes.get(id(schema))
+        if node is None:
+            node = self.nodes[id(schema)] = self._compile(schema)
+        return node
+
+    def _compile(self, schema):
+        self.ignored.update(schema.keys() - HONOURED_KEYWORDS)
+        if isinstance(schema.get("$ref"), str):  # other keywords are ignored
+            return RefNode(self, schema["$ref"])
+        if "const" in schema:
+            return ConstNode([schema["const"]])
+        if isinstance(schema.get("enum"), list):
+            return ConstNode(schema["enum"])
+        types = schema.get("type")
+        if types is None:
+            types = infer_type(schema)
+        if isinstance(types, list):
+            types = list(dict.fromkeys(types))
+            if len(types) == 1:
+                types = types[0]
+            else:
+                return UnionNode([self.of_type(schema, t) for t in types], types)
+        node = self.of_type(schema, types)
+        node.typed = "type" in schema
+        return node
+
+    def of_type(self, schema, type_):
+        match type_:
+            case "object":
+                properties = schema.get("properties", {})
+                required = set(schema.get("required", []))
+                entries = []
+                for name, subschema in properties.items():
+                    node = self.compile(subschema)
+                    if node is None:
+                        if name in required:
+                            raise ValueError(f"Property {name} is required but false.")
+                        continue
+                    entries.append((name, node, name in required))
+                entries.extend((name, AnyNode(), True) for name in required
+                               if name not in properties)
+                return ObjectNode(entries)
+            case "array":
+                items = schema.get("items", {})
+                if isinstance(items, list):
+                    items = [self.compile(s) for s in items]
+                    if None in items:
+                        items = items[:items.index(None)]
+                else:
+                    items = self.compile(items)
+                return ArrayNode(items, schema.get("minItems", 0), schema.get("maxItems"))
+            case "string":
+                return StringNode(schema)
+            case "integer" | "number":
+                return NumberNode(schema, type_ == "integer")
+            case "boolean":
+                return BooleanNode()
+            case "null":
+                return NullNode()
+            case None:
+                return AnyNode()
+        raise ValueError(f"Unknown type {type_!r}.")
+
+
+def infer_type(schema):
+    keys = schema.keys()
+    if keys & {"properties", "required"}:
+        return "object"
+    if keys & {"items", "minItems", "maxItems"}:
+        return "array"
+    if keys & {"pattern", "format", "minLength", "maxLength"}:
+        return "string"
+    if keys & {"minimum", "maximum", "exclusiveMinimum", "exclusiveMaximum",
+               "multipleOf"}:
+        return "number"
+    return None
+
+
+class InstanceGenerator:
+    # Records which fit the schema, or with a violation at the rate of invalid
+    # records. Records depend on the seed and their position only, so that the
+    # same file is generated by any number of processes.
+    def __init__(self, schema, seed=0, invalid_rate=0.0, violations=DEFAULT_VIOLATIONS):
+        self.schema = schema
+        self.seed = seed
+        self.invalid_rate = invalid_rate
+        self.violations = tuple(violations)
+        compiler = Compiler(schema)
+        self.root = compiler.compile(schema)
+        if self.root is None:
+            raise ValueError("No data fits the schema false.")
+        self.ignored = sorted(compiler.ignored)
+        self.routes = []
+        if invalid_rate > 0:
+            self.routes = [(route, kind) for route, kind in self.root.routes(set())
+                           if kind in self.violations]
+            if not self.routes:
+                raise ValueError("The schema has none of the chosen violations.")
+
+    def records(self, index, n):
+        # Records of the chunk at the index, and the number of invalid ones
+        rng = random.Random(f"{self.seed}:{index}")
+        generate = self.root.generate
+        records = []
+        n_invalid = 0
+        for _ in range(n):
+            if self.invalid_rate and rng.random() < self.invalid_rate:
+                route, kind = rng.choice(self.routes)
+                records.append(self.root.violate(rng, route, kind))
+                n_invalid += 1
+            else:
+                records.append(generate(rng))
+        return records, n_invalid
+
+    def chunk(self, index, n):
+        # JSON lines of the chunk at the index, and the number of invalid records
+        records, n_invalid = self.records(index, n)
+        encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+        lines = [encode(record) for record in records]
+        lines.append("")
+        return "\n".join(lines).encode("utf-8"), n_invalid
+
+    def write(self, f, n, processes=None):
+        # Writes n records as JSON lines to the binary file, and yields the numbers
+        # of records and of invalid ones written after each chunk. Closing the
+        # generator cancels the chunks not written.
+        chunks = [(i, min(CHUNK_RECORDS, n - i * CHUNK_RECORDS))
+                  for i in range(math.ceil(n / CHUNK_RECORDS))]
+        if processes is None:
+            processes = os.cpu_count() or 1
+        n_written = n_invalid = 0
+        if processes <= 1 or len(chunks) <= 1:
+            for i, size in chunks:
+                data, invalid = self.chunk(i, size)
+                f.write(data)
+                n_written += size
+                n_invalid += invalid
+                yield n_written, n_invalid
+            return
+        # Imported here to keep the start of the command line fast
+        from concurrent.futures import ProcessPoolExecutor
+
+        executor = ProcessPoolExecutor(
+            max_workers=processes, initializer=_init_worker,
+            initargs=(json.dumps(self.schema), self.seed, self.invalid_rate,
+                      self.violations))
+        try:
+            # A few chunks ahead of the writer, which keeps them in order
+            remaining = iter(chunks)
+            pending = deque((size, executor.submit(_chunk, i, size))
+                            for i, size in islice(remaining, 2 * processes))
+            while pending:
+                size, future = pending.popleft()
+                data, invalid = future.result()
+                for i, next_size in islice(remaining, 1):
+                    pending.append((next_size, executor.submit(_chunk, i, next_size)))
+                f.write(data)
+                n_written += size
+                n_invalid += invalid
+                yield n_written, n_invalid
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Generator of a worker process of InstanceGenerator.write
+_worker_generator = None
+
+
+def _init_worker(schema_json, seed, invalid_rate, violations):
+    global _worker_generator
+    _worker_generator = InstanceGenerator(
+        json.loads(schema_json), seed, invalid_rate, violations)
+
+
+def _chunk(index, n):
+    return _worker_generator.chunk(index, n)
@@ -0,0 +1,79 @@
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+from tracing import TRACER
+from validation import SchemaChecker, subschema_error
+
+DEBOUNCE_MS = 400
+
+
+class CheckSignals(QObject):
+    finished = pyqtSignal(int, bool, list)  # revision, full, results
+
+
+class CheckTask(QRunnable):
+    def __init__(self, revision, full, jobs):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.revision = revision
+        self.full = full
+        self.jobs = jobs
+        self.cancelled = False
+        self.signals = CheckSignals()
+
+    def run(self):
+        results = []
+        for schema, path, shallow in self.jobs:
+            if self.cancelled:
+                return
+            results.append((schema, path, subschema_error(shallow, path)))
+        self.signals.finished.emit(self.revision, self.full, results)
+
+
+class LiveValidator(QObject):
+    # Checks the schema against the meta-schema on a worker thread after edits,
+    # and marks the invalid nodes in the model
+    checked = pyqtSignal(int)  # number of invalid subschemas
+
+    def __init__(self, model, checker=None, parent=None):
+        super().__init__(parent)
+        self.model = model
+        self.checker = SchemaChecker() if checker is None else checker
+        self.task = None
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(DEBOUNCE_MS)
+        self.timer.timeout.connect(self.start)
+
+    def schedule(self):
+        # Restarting the timer merges a burst of edits into one check
+        self.timer.start()
+
+    def start(self):
+        if self.task is not None:
+            self.task.cancelled = True  # stale
+        with TRACER.action("Start live validation"):
+            full, jobs = self.checker.jobs(self.model.root.schema)
+        if not jobs:
+            return
+        self.task = CheckTask(self.model.revision, full, jobs)
+        self.task.signals.finished.connect(self.finished)
+        self.pool.start(self.task)
+
+    def finished(self, revision, full, results):
+        if revision != self.model.revision:
+            return  # stale; the edit has scheduled another check
+        self.task = None
+        with TRACER.action("Live validation results"):
+            with TRACER.phase("update checker"):
+                self.checker.update(self.model.root.schema, full, results)
+            with TRACER.phase("set_errors"):
+                self.model.set_errors(results, full)
+        self.checked.emit(len(self.checker.changed))
+
+    def stop(self):
+        self.timer.stop()
+        if self.task is not None:
+            self.task.cancelled = True
+        self.pool.waitForDone()
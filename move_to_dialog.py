@@ -1,18 +1,68 @@
+from PyQt6.QtCore import QSortFilterProxyModel, QTimer
 from PyQt6.QtWidgets import *
 
 from is_type import is_type
 
+FILTER_DEBOUNCE_MS = 150
+MAX_FILTER_HITS = 1000  # shown in the filtered tree
 
-class MoveToDialog(QDialog):
+
+class ContainerFilterModel(QSortFilterProxyModel):
+    # Shows object and array nodes of the schema model only, without the ones
+    # shown through a $ref, which are read only
     def __init__(self, parent=None):
+        super().__init__(parent)
+        self.shown = None  # ids of the nodes matching the filter and their ancestors
+
+    def set_shown(self, shown):
+        self.shown = shown
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        index = self.sourceModel().index(source_row, 0, source_parent)
+        node = index.internalPointer()
+        if node.parent is None:  # root node
+            return True
+        if node.referenced:
+            return False
+        if self.shown is not None and id(node) not in self.shown:
+            return False
+        type_ = node.schema.get("type")
+        return is_type(type_, "object") or is_type(type_, "array")
+
+    def filterAcceptsColumn(self, source_column, source_parent):
+        return source_column < 2
+
+
+class MoveToDialog(QDialog):
+    # Created once over the model of the editor, which the proxy follows, so it
+    # opens without building a tree. find(query) returns the JSON pointers of
+    # the subschemas matching a SearchIndex query.
+    def __init__(self, model, find, parent=None):
         super().__init__(parent=parent)
         self.setWindowTitle("Destination selector")
+        self.model = model
+        self.find = find
         layout = QVBoxLayout()
-        self.tree = QTreeWidget()
-        self.tree.setHeaderLabels(["Node", ""])
-        self.path = []  # identical location to selected node
+        self.filter_box = QLineEdit()
+        self.filter_box.setPlaceholderText("Type to filter destinations by name")
+        self.filter_box.setClearButtonEnabled(True)
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(FILTER_DEBOUNCE_MS)
+        self.filter_timer.timeout.connect(self.apply_filter)
+        self.filter_box.textChanged.connect(self.filter_timer.start)
+        self.filter_box.returnPressed.connect(self.flush_filter)  # before accepting
+        layout.addWidget(self.filter_box)
+        self.proxy = ContainerFilterModel(self)
+        self.proxy.setSourceModel(model)
+        self.proxy.modelReset.connect(self.model_reset)
+        self.tree = QTreeView()
+        self.tree.setModel(self.proxy)
         self.tree.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
         layout.addWidget(self.tree)
+        self.status = QLabel()
+        layout.addWidget(self.status)
 
         button_box = QDialogButtonBox(
             QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel
@@ -22,48 +72,65 @@ class MoveToDialog(QDialog):
         layout.addWidget(button_box)
 
         self.setLayout(layout)
+        self.expanded = False  # since the model was reset
 
-    def refresh_tree(self, schema):
-        self.tree.clear()
-        root_item = QTreeWidgetItem(["root", ""])
-        self.tree.addTopLevelItem(root_item)
-        for field, property_ in schema.get("properties", {}).items():
-            json_object_to_tree(
-                root_item,
-                field,
-                property_,
-            )
-        self.tree.expandAll()
-        self.tree.resizeColumnToContents(0)
-
-
-def json_object_to_tree(parent, field_name, property_, is_array_item=False):
-    assert isinstance(parent, QTreeWidgetItem), "Parent node is not a tree item."
-
-    if not (is_type(property_.get("type"), "object") or
-            is_type(property_.get("type"), "array")
-    ):
-        return
-
-    if is_array_item:
-        col_0 = "<element>"
-        col_1 = "E"
-    else:
-        col_0 = field_name
-        col_1 = ""
-    self_ = QTreeWidgetItem([col_0, col_1])
-    parent.addChild(self_)
-    if "properties" in property_.keys():
-        for sub_field, sub_property in property_["properties"].items():
-            json_object_to_tree(
-                self_,
-                sub_field,
-                sub_property,
-            )
-    elif "items" in property_.keys():
-        json_object_to_tree(
-            self_,
-            None,
-            property_["items"],
-            is_array_item=True
-        )
+    def model_reset(self):
+        self.expanded = False
+
+    def choose(self, lazy=False):
+        # Returns the chosen node, or None if the dialog is cancelled. The tree
+        # keeps its expanded nodes between uses.
+        self.filter_box.clear()
+        self.filter_timer.stop()
+        self.proxy.set_shown(None)
+        self.status.clear()
+        if not self.expanded:
+            if lazy:
+                self.tree.expand(self.proxy.index(0, 0))
+            else:
+                self.tree.expandAll()
+            self.tree.resizeColumnToContents(0)
+            self.expanded = True
+        self.tree.clearSelection()
+        self.filter_box.setFocus()
+        if self.exec() != QDialog.DialogCode.Accepted:
+            return None
+        return self.selected_node()
+
+    def apply_filter(self):
+        words = self.filter_box.text().split()
+        if not words:
+            self.proxy.set_shown(None)
+            self.status.clear()
+            return
+        query = " ".join("name:" + word for word in words)
+        pointers = self.find(query + " type:object") | self.find(query + " type:array")
+        nodes = [self.model.node_at(p) for p in sorted(pointers)[:MAX_FILTER_HITS]]
+        shown = {}
+        for node in nodes:
+            while node is not None and id(node) not in shown:
+                shown[id(node)] = node
+                node = node.parent
+        self.proxy.set_shown(shown.keys())
+        for node in shown.values():
+            self.tree.expand(self.proxy.mapFromSource(self.model.index_of(node)))
+        if nodes:
+            index = self.proxy.mapFromSource(self.model.index_of(nodes[0]))
+            self.tree.setCurrentIndex(index)
+            self.tree.scrollTo(index)
+        if len(pointers) > len(nodes):
+            self.status.setText(
+                f"Showing the first {len(nodes):,} of {len(pointers):,} destinations.")
+        else:
+            self.status.setText(f"{len(nodes):,} destinations.")
+
+    def flush_filter(self):
+        if self.filter_timer.isActive():
+            self.filter_timer.stop()
+            self.apply_filter()
+
+    def selected_node(self):
+        indexes = self.tree.selectionModel().selectedRows()
+        if not indexes:
+            return None
+        return self.proxy.mapToSource(indexes[0]).internalPointer()
@@ -0,0 +1,159 @@
+import json
+import os
+import time
+
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, QThread, Qt, pyqtSignal
+from PyQt6.QtWidgets import *
+
+from validation import CostProfile, iter_stream_errors, root_is_array, stream_blockers
+
+
+def display_pointer(pointer):
+    # As a URI fragment, so that the root is shown as well
+    return pointer if pointer == CostProfile.OTHER_FILES else "#" + pointer
+
+
+class ProfileThread(QThread):
+    progress = pyqtSignal(int, int)  # files done, records validated
+
+    def __init__(self, validator, paths, stream_threshold, parent=None):
+        super().__init__(parent)
+        self.validator = validator  # of CostProfile
+        self.paths = paths
+        self.stream_threshold = stream_threshold
+        self.n_records = 0
+        self.n_errors = 0
+        self.error = None
+
+    def run(self):
+        last_report = time.perf_counter()
+        for i, fp in enumerate(self.paths):
+            jsonl = fp.lower().endswith((".jsonl", ".ndjson"))
+            try:
+                with open(fp, "rb") as f:
+                    if jsonl or (os.path.getsize(fp) > self.stream_threshold and
+                                 root_is_array(fp) and
+                                 not stream_blockers(self.validator.schema)):
+                        results = (
+                            errors for _, errors in
+                            iter_stream_errors(self.validator, f, jsonl))
+                    else:
+                        results = [list(self.validator.iter_errors(json.load(f)))]
+                    for errors in results:
+                        if self.isInterruptionRequested():
+                            return
+                        self.n_records += 1
+                        self.n_errors += len(errors)
+                        now = time.perf_counter()
+                        if now - last_report > 0.1:
+                            self.progress.emit(i, self.n_records)
+                            last_report = now
+            except (OSError, UnicodeDecodeError, json.JSONDecodeError) as e:
+                self.error = f"{fp}: {e}"
+                return
+            self.progress.emit(i + 1, self.n_records)
+
+
+class ProfileProgressDialog(QProgressDialog):
+    def __init__(self, validator, paths, stream_threshold, parent=None):
+        super().__init__(parent=parent)
+        self.setWindowTitle("Profile validation")
+        self.setLabelText("Validating...")
+        self.setRange(0, len(paths))
+        self.setMinimumDuration(0)
+        self.setAutoClose(False)
+        self.setAutoReset(False)
+        self.thread_ = ProfileThread(validator, paths, stream_threshold, self)
+        self.thread_.progress.connect(self.update_progress)
+        self.thread_.finished.connect(self.accept)
+        self.canceled.connect(self.thread_.requestInterruption)
+        self.thread_.start()
+
+    def update_progress(self, n_files, n_records):
+        self.setValue(n_files)
+        self.setLabelText(f"{n_files:,} files, {n_records:,} records")
+
+
+class CostTableModel(QAbstractTableModel):
+    # Rows of tuples, whose floats are seconds shown in milliseconds
+    def __init__(self, columns, rows, parent=None):
+        super().__init__(parent)
+        self.columns = columns
+        self.rows = rows
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.columns)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        value = self.rows[index.row()][index.column()]
+        if role == Qt.ItemDataRole.TextAlignmentRole and not isinstance(value, str):
+            return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if isinstance(value, float):
+            return f"{value * 1000:,.3f}"
+        if isinstance(value, int):
+            return f"{value:,}"
+        return value
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.columns[section]
+        return section + 1
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        if column < 0:
+            return
+        self.layoutAboutToBeChanged.emit()
+        self.rows.sort(key=lambda row: row[column],
+                       reverse=order == Qt.SortOrder.DescendingOrder)
+        self.layoutChanged.emit()
+
+
+class ProfileDialog(QDialog):
+    def __init__(self, profile, summary, parent=None):
+        super().__init__(parent=parent)
+        self.setWindowTitle("Validation profile")
+        layout = QVBoxLayout()
+        layout.addWidget(QLabel(summary))
+        tabs = QTabWidget()
+        pointers = profile.by_pointer()
+        tabs.addTab(self.table(
+            ["Subschema", "Instances", "Time (ms)", "Self time (ms)"],
+            [(display_pointer(pointer), *cost) for pointer, cost in pointers.items()],
+            3), "Subschemas")
+        tabs.addTab(self.table(
+            ["Keyword", "Calls", "Self time (ms)"],
+            [(keyword, *cost) for keyword, cost in profile.by_keyword().items()], 2),
+            "Keywords")
+        tabs.addTab(self.table(
+            ["Subschema", "Keyword", "Calls", "Time (ms)", "Self time (ms)"],
+            [(display_pointer(pointer), keyword, *cost)
+             for (pointer, keyword), cost in profile.costs.items()], 4),
+            "Keywords of subschemas")
+        layout.addWidget(tabs)
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+        self.setLayout(layout)
+        screen_size = self.screen().size()
+        self.resize(round(0.5 * screen_size.width()), round(0.6 * screen_size.height()))
+
+    def table(self, columns, rows, sort_column):
+        # Sorted by self time, the most expensive first
+        view = QTableView()
+        view.setModel(CostTableModel(columns, rows, view))
+        view.setWordWrap(False)
+        view.horizontalHeader().setResizeContentsPrecision(100)
+        view.horizontalHeader().setStretchLastSection(True)
+        view.setSortingEnabled(True)
+        view.sortByColumn(sort_column, Qt.SortOrder.DescendingOrder)
+        view.resizeColumnsToContents()
+        return view
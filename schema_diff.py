@@ -0,0 +1,72 @@
+from schema_model import child_container, child_pointer
+
+# Changes of a keyword or a subschema
+ADDED = "added"
+REMOVED = "removed"
+CHANGED = "changed"
+REORDERED = "reordered"
+
+
+def children_keyword(schema, root):
+    # The keyword whose subschemas are nodes of the tree, as in schema_entries
+    keyword = child_container(schema)
+    if keyword == "items" and root:  # root shows properties only
+        return None
+    if keyword is not None and not isinstance(schema[keyword], dict):
+        return None
+    return keyword
+
+
+def diff_schemas(old, new, old_hashes, new_hashes):
+    # Yields (JSON pointer of the subschema, keyword or None for the whole
+    # subschema, change, old value, new value), parents before children. A
+    # value is None if it is absent. Subtrees whose digests are equal are
+    # skipped, so the cost follows the differences rather than the size.
+    def same(a, b):
+        if isinstance(a, (dict, list)) and isinstance(b, (dict, list)):
+            return old_hashes.digest(a) == new_hashes.digest(b)
+        return type(a) is type(b) and a == b
+
+    stack = [] if same(old, new) else [("", old, new)]  # of different subschemas
+    while stack:
+        pointer, old, new = stack.pop()
+        if not isinstance(old, dict) or not isinstance(new, dict):
+            yield pointer, None, CHANGED, old, new
+            continue
+        keyword = children_keyword(old, pointer == "")
+        container = keyword if keyword == children_keyword(new, pointer == "") else None
+        for key, value in new.items():
+            if key == container:
+                continue
+            if key not in old.keys():
+                yield pointer, key, ADDED, None, value
+            elif not same(old[key], value):
+                yield pointer, key, CHANGED, old[key], value
+        for key, value in old.items():
+            if key != container and key not in new.keys():
+                yield pointer, key, REMOVED, value, None
+        old_order = [key for key in old if key in new.keys()]
+        new_order = [key for key in new if key in old.keys()]
+        if old_order != new_order:
+            yield pointer, None, REORDERED, old_order, new_order
+
+        children = []  # compared after the keywords of this subschema
+        if container == "items":
+            if not same(old["items"], new["items"]):
+                children.append((child_pointer(pointer, None), old["items"], new["items"]))
+        elif container == "properties":
+            old_properties, new_properties = old["properties"], new["properties"]
+            for field_name, property_ in new_properties.items():
+                if field_name not in old_properties.keys():
+                    yield child_pointer(pointer, field_name), None, ADDED, None, property_
+                elif not same(old_properties[field_name], property_):
+                    children.append((child_pointer(pointer, field_name),
+                                     old_properties[field_name], property_))
+            for field_name, property_ in old_properties.items():
+                if field_name not in new_properties.keys():
+                    yield child_pointer(pointer, field_name), None, REMOVED, property_, None
+            old_order = [k for k in old_properties if k in new_properties.keys()]
+            new_order = [k for k in new_properties if k in old_properties.keys()]
+            if old_order != new_order:
+                yield pointer, "properties", REORDERED, old_order, new_order
+        stack.extend(reversed(children))
@@ -0,0 +1,296 @@
+# Command line validator, which doesn't import Qt.
+# Usage: python -m schema_editor validate schema.json data/*.json
+#        python -m schema_editor generate schema.json data.jsonl -n 1000000
+import argparse
+import json
+import sys
+import time
+
+from validation import (CostProfile, check_schema, format_path, iter_stream_errors,
+                        make_validator)
+
+EXIT_VALID = 0
+EXIT_INVALID = 1  # some data doesn't fit the schema
+EXIT_ERROR = 2  # bad arguments, invalid schema, or unreadable file
+
+
+def load_schema(fp):
+    try:
+        with open(fp, "r", encoding="utf-8") as f:
+            return json.load(f), None
+    except (OSError, UnicodeDecodeError, json.JSONDecodeError) as e:
+        return None, f"Fail to open the schema: {e}"
+
+
+def validate_file(validator, fp, max_errors=None):
+    result = {"file": fp, "valid": None, "error_count": 0, "errors": []}
+    try:
+        if fp.lower().endswith((".jsonl", ".ndjson")):
+            with open(fp, "rb") as f:
+                for line_no, errors in iter_stream_errors(validator, f, jsonl=True):
+                    for e in errors:
+                        add_error(result, e, max_errors, line=line_no)
+        else:
+            with open(fp, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for e in validator.iter_errors(data):
+                add_error(result, e, max_errors)
+    except (OSError, UnicodeDecodeError, json.JSONDecodeError) as e:
+        result["message"] = f"Fail to open the data file: {e}"
+        return result
+    result["valid"] = result["error_count"] == 0
+    return result
+
+
+def add_error(result, error, max_errors, line=None):
+    result["error_count"] += 1
+    if max_errors is not None and len(result["errors"]) >= max_errors:
+        return
+    record = {
+        "path": format_path(error.path),
+        "message": error.message,
+        "keyword": error.validator,
+    }
+    if line is not None:
+        record["line"] = line
+    result["errors"].append(record)
+
+
+def print_text(result):
+    if result["valid"] is None:
+        print(f"{result['file']}: {result['message']}")
+        return
+    if result["valid"]:
+        print(f"{result['file']}: valid")
+        return
+    print(f"{result['file']}: {result['error_count']} errors")
+    for e in result["errors"]:
+        prefix = f"Line {e['line']}: " if "line" in e else ""
+        print(f"  {prefix}At {e['path']}, {e['message']}.")
+    n_hidden = result["error_count"] - len(result["errors"])
+    if n_hidden:
+        print(f"  {n_hidden} more errors are not shown.")
+
+
+def load_checked_schema(args):
+    # Returns the schema and the registry of the workspace, or None after
+    # printing the error
+    schema, message = load_schema(args.schema)
+    if message is None:
+        message = check_schema(schema)
+        if message is not None:
+            message = "Schema is invalid: " + message
+    if message is not None:
+        if args.format == "json":
+            json.dump({"schema": args.schema, "schema_valid": False, "message": message},
+                      sys.stdout)
+            print()
+        else:
+            print(f"{args.schema}: {message}")
+        return None
+
+    registry = None
+    if args.workspace is not None:  # $ref to the other schemas of the directory
+        from workspace import Workspace
+
+        workspace = Workspace(args.workspace)
+        schema = workspace.document(schema, args.schema)
+        registry = workspace.registry
+    return schema, registry
+
+
+def validate(args):
+    loaded = load_checked_schema(args)
+    if loaded is None:
+        return EXIT_ERROR
+    validator = make_validator(*loaded)
+    results = []
+    exit_code = EXIT_VALID
+    for fp in args.data:
+        result = validate_file(validator, fp, args.max_errors)
+        if result["valid"] is None:
+            exit_code = EXIT_ERROR
+        elif not result["valid"] and exit_code == EXIT_VALID:
+            exit_code = EXIT_INVALID
+        if args.format == "json":
+            results.append(result)
+        else:
+            print_text(result)
+    if args.format == "json":
+        json.dump({"schema": args.schema, "schema_valid": True, "files": results},
+                  sys.stdout, ensure_ascii=False)
+        print()
+    return exit_code
+
+
+def profile(args):
+    loaded = load_checked_schema(args)
+    if loaded is None:
+        return EXIT_ERROR
+    costs = CostProfile(loaded[0])
+    validator = costs.validator(*loaded)
+    n_errors = 0
+    for fp in args.data:
+        result = validate_file(validator, fp, max_errors=0)
+        if result["valid"] is None:
+            print(f"{result['file']}: {result['message']}")
+            return EXIT_ERROR
+        n_errors += result["error_count"]
+    subschemas = sorted(costs.by_pointer().items(), key=lambda c: -c[1][2])
+    keywords = sorted(costs.by_keyword().items(), key=lambda c: -c[1][1])
+    if args.format == "json":
+        json.dump({
+            "schema": args.schema,
+            "time_ms": costs.total() * 1000,
+            "error_count": n_errors,
+            "subschemas": [
+                {"pointer": pointer, "instances": instances, "time_ms": time * 1000,
+                 "self_time_ms": self_time * 1000}
+                for pointer, (instances, time, self_time) in subschemas[:args.top]],
+            "keywords": [
+                {"keyword": keyword, "calls": calls, "self_time_ms": self_time * 1000}
+                for keyword, (calls, self_time) in keywords[:args.top]],
+        }, sys.stdout, ensure_ascii=False)
+        print()
+        return EXIT_VALID
+    print(f"Validated in {costs.total() * 1000:,.1f} ms, with {n_errors:,} errors.")
+    print(f"{'Self time (ms)':>15} {'Time (ms)':>12} {'Instances':>10}  Subschema")
+    for pointer, (instances, time, self_time) in subschemas[:args.top]:
+        print(f"{self_time * 1000:15,.3f} {time * 1000:12,.3f} {instances:10,}  "
+              f"{pointer if pointer == CostProfile.OTHER_FILES else '#' + pointer}")
+    print(f"{'Self time (ms)':>15} {'Calls':>12}  Keyword")
+    for keyword, (calls, self_time) in keywords[:args.top]:
+        print(f"{self_time * 1000:15,.3f} {calls:12,}  {keyword}")
+    return EXIT_VALID
+
+
+def generate(args):
+    # Imported here to keep the start of the other commands fast
+    from instance_generator import DEFAULT_VIOLATIONS, VIOLATIONS, InstanceGenerator
+
+    violations = args.violations or DEFAULT_VIOLATIONS
+    unknown = [v for v in violations if v not in VIOLATIONS]
+    if unknown:
+        print(f"Unknown violations: {', '.join(unknown)}. Choose among "
+              f"{', '.join(VIOLATIONS)}.", file=sys.stderr)
+        return EXIT_ERROR
+    schema, message = load_schema(args.schema)
+    if message is None:
+        message = check_schema(schema)
+        if message is not None:
+            message = "Schema is invalid: " + message
+    if message is None:
+        try:
+            generator = InstanceGenerator(
+                schema, args.seed, args.invalid_rate, violations)
+        except ValueError as e:
+            message = str(e)
+    if message is not None:
+        print(f"{args.schema}: {message}", file=sys.stderr)
+        return EXIT_ERROR
+    if generator.ignored:
+        print(f"{args.schema}: these keywords are ignored, so some records may not "
+              f"fit the schema: {', '.join(generator.ignored)}", file=sys.stderr)
+    n_records = n_invalid = 0
+    start = time.perf_counter()
+    try:
+        f = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+        try:
+            for n_records, n_invalid in generator.write(f, args.count, args.processes):
+                pass
+        finally:
+            if f is not sys.stdout.buffer:
+                f.close()
+    except (OSError, ValueError) as e:
+        print(f"{args.output}: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    seconds = time.perf_counter() - start
+    print(f"Wrote {n_records:,} records, {n_invalid:,} of them invalid, to "
+          f"{args.output} in {seconds:,.1f} s "
+          f"({n_records / max(seconds, 1e-9) * 60:,.0f} records per minute).",
+          file=sys.stderr)
+    return EXIT_VALID
+
+
+def check(args):
+    schema, message = load_schema(args.schema)
+    if message is None:
+        message = check_schema(schema)
+    if args.format == "json":
+        json.dump({"schema": args.schema, "valid": message is None,
+                   "message": message or ""}, sys.stdout, ensure_ascii=False)
+        print()
+    else:
+        print(f"{args.schema}: {message or 'Schema is valid.'}")
+    return EXIT_VALID if message is None else EXIT_ERROR
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m schema_editor",
+        description="Validate JSON data against a Draft-7 JSON schema.",
+        epilog=f"Exit codes: {EXIT_VALID} all data fits the schema, {EXIT_INVALID} "
+               f"some data doesn't fit the schema, {EXIT_ERROR} invalid schema or "
+               f"unreadable file.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    validate_parser = subparsers.add_parser(
+        "validate", help="Validate JSON or JSON Lines files against a schema.")
+    validate_parser.add_argument("schema")
+    validate_parser.add_argument("data", nargs="+")
+    validate_parser.add_argument(
+        "--max-errors", type=int, default=None,
+        help="Report at most this number of errors per file; all are counted.")
+    validate_parser.set_defaults(func=validate)
+
+    profile_parser = subparsers.add_parser(
+        "profile", help="Show which subschemas and keywords validation spends "
+                        "the time in.")
+    profile_parser.add_argument("schema")
+    profile_parser.add_argument("data", nargs="+")
+    profile_parser.add_argument(
+        "--top", type=int, default=20,
+        help="Show this number of the most expensive subschemas and keywords.")
+    profile_parser.set_defaults(func=profile)
+
+    for p in (validate_parser, profile_parser):
+        p.add_argument(
+            "--workspace", metavar="DIRECTORY", default=None,
+            help="Resolve $ref in the schemas of this directory.")
+
+    generate_parser = subparsers.add_parser(
+        "generate", help="Write records which fit a schema, or deliberately don't, "
+                         "as JSON Lines.")
+    generate_parser.add_argument("schema")
+    generate_parser.add_argument("output", help="JSON Lines file, or - for stdout")
+    generate_parser.add_argument("-n", "--count", type=int, default=1000)
+    generate_parser.add_argument(
+        "--seed", type=int, default=0,
+        help="The same seed writes the same records, with any number of processes.")
+    generate_parser.add_argument(
+        "--invalid-rate", type=float, default=0.0,
+        help="Share of the records with one violation, e.g. 0.01.")
+    generate_parser.add_argument(
+        "--violations", nargs="+", metavar="KEYWORD",
+        help="Kinds of violation of invalid records, by keyword, e.g. type required "
+             "pattern. All of them but format by default, which the validator "
+             "doesn't check.")
+    generate_parser.add_argument(
+        "--processes", type=int, default=None,
+        help="Worker processes; the number of CPUs by default.")
+    generate_parser.set_defaults(func=generate)
+
+    check_parser = subparsers.add_parser(
+        "check", help="Check a schema against the Draft-7 meta-schema.")
+    check_parser.add_argument("schema")
+    check_parser.set_defaults(func=check)
+
+    for p in (validate_parser, profile_parser, check_parser):
+        p.add_argument("--format", choices=["text", "json"], default="text")
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
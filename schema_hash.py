@@ -0,0 +1,81 @@
+from hashlib import blake2b
+
+DIGEST_SIZE = 16  # bytes
+SLACK = 1024  # digests of replaced values kept beyond twice the current ones
+
+
+class SchemaHashes:
+    # Merkle hashes of JSON values. A dict or list is hashed from the digests of
+    # its items, which are cached by identity, so that hashing a changed schema
+    # again only hashes the dicts and lists along the changed paths. SchemaModel
+    # changes dicts in place, so it invalidates them along the path of a change.
+    def __init__(self):
+        self.digests = {}  # id of dict or list -> (dict or list, digest)
+        self.limit = None  # number of digests beyond which they are cleared
+
+    def clear(self):
+        self.digests = {}
+        self.limit = None
+
+    def digest(self, value):
+        entry = self.digests.get(id(value))
+        if entry is not None and entry[0] is value:
+            return entry[1]
+        digest = self._digest(value)
+        if self.limit is None:
+            self.limit = 2 * len(self.digests) + SLACK
+        elif len(self.digests) > self.limit:  # mostly of replaced values
+            self.digests = {}
+            digest = self._digest(value)
+            self.limit = 2 * len(self.digests) + SLACK
+        return digest
+
+    def _digest(self, value):
+        if not isinstance(value, (dict, list)):
+            return blake2b(repr(value).encode(), digest_size=DIGEST_SIZE).digest()
+        digests = self.digests
+        stack = [value]
+        while stack:  # the items of a dict or list are hashed before it
+            v = stack[-1]
+            entry = digests.get(id(v))
+            if entry is not None and entry[0] is v:
+                stack.pop()
+                continue
+            try:
+                digest = self._hash(v)
+            except KeyError:  # of an item which isn't hashed yet
+                stack.extend(
+                    item for item in (v.values() if isinstance(v, dict) else v)
+                    if isinstance(item, (dict, list)) and id(item) not in digests)
+                continue
+            stack.pop()
+            digests[id(v)] = (v, digest)
+        return digests[id(value)][1]
+
+    def _hash(self, value):
+        # The keys and the items are separated by NUL, which repr escapes. The
+        # digest of a dict or list follows "#" as it may contain NUL.
+        digests = self.digests
+        items = [
+            b"#" + digests[id(item)][1] if isinstance(item, (dict, list))
+            else repr(item).encode()
+            for item in (value.values() if isinstance(value, dict) else value)
+        ]
+        if isinstance(value, dict):
+            head = b"{" + "\0".join(map(repr, value)).encode() + b"\1"
+        else:
+            head = b"["
+        return blake2b(head + b"\0".join(items), digest_size=DIGEST_SIZE).digest()
+
+    def invalidate(self, schema, path):
+        # The dicts from the schema along the path of a subschema, and its
+        # properties, have changed in place
+        value = schema
+        for token in path:
+            if not isinstance(value, dict):
+                return
+            self.digests.pop(id(value), None)
+            value = value.get(token)
+        if isinstance(value, dict):
+            self.digests.pop(id(value), None)
+            self.digests.pop(id(value.get("properties")), None)
@@ -0,0 +1,237 @@
+import hashlib
+import json
+import marshal
+import os
+import sys
+import tempfile
+
+from PyQt6.QtCore import QThread, pyqtSignal
+from PyQt6.QtWidgets import *
+
+CHUNK_SIZE = 1 << 20
+CACHE_FORMAT = 1
+
+
+class SchemaCache:
+    # Parsed schemas in marshal files, one per schema path. A file is used only
+    # if the size and modification time of the schema are unchanged. The least
+    # recently used files are removed beyond max_bytes.
+    def __init__(self, directory, max_bytes, min_size=1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.min_size = min_size  # smaller schemas are parsed quickly anyway
+
+    def _file(self, path):
+        key = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, key + ".marshal")
+
+    @staticmethod
+    def _header(stat):
+        python = "%d.%d" % sys.version_info[:2]
+        return f"{CACHE_FORMAT} {python} {stat.st_size} {stat.st_mtime_ns}\n".encode()
+
+    def get(self, path, stat):
+        # Returns None if the schema is not cached
+        if stat.st_size < self.min_size:
+            return None
+        file = self._file(path)
+        try:
+            with open(file, "rb") as f:
+                if f.readline() != self._header(stat):
+                    return None
+                # marshal.load() reads a file in small pieces, which is slow
+                schema = marshal.loads(f.read())
+            os.utime(file)  # recently used
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        return schema
+
+    def put(self, path, stat, schema):
+        if stat.st_size < self.min_size:
+            return
+        # Failures are ignored, as the cache is optional
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(self._header(stat))
+                f.write(marshal.dumps(schema))
+            os.replace(temp_path, self._file(path))
+        except (OSError, ValueError):
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return
+        self.prune()
+
+    def prune(self):
+        entries = []
+        try:
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(".marshal"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            return
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+
+def dump_schema(schema, f, compact=False):
+    if compact:
+        json.dump(schema, f, ensure_ascii=False, separators=(",", ":"))
+    else:
+        json.dump(schema, f, indent=4, ensure_ascii=False)
+
+
+def new_file_mode(directory):
+    # The mode of a new file in the directory, which the umask applies to. An
+    # empty file is created under a temporary name to find it, as os.umask()
+    # changes the umask for the whole process for a moment, racing with files
+    # created by other threads.
+    while True:
+        probe = os.path.join(directory, f".mode-{os.urandom(8).hex()}.tmp")
+        try:
+            fd = os.open(probe, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        except FileExistsError:
+            continue
+        try:
+            return os.fstat(fd).st_mode
+        finally:
+            os.close(fd)
+            os.remove(probe)
+
+
+def write_atomic(path, schema, compact=False):
+    # Writes a temporary file in the same directory, then renames it over the
+    # target, so the target is either the old or the new file after a crash
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            dump_schema(schema, f, compact)
+            f.flush()
+            os.fsync(f.fileno())
+        try:  # mkstemp() creates the file readable by the owner only
+            mode = os.stat(path).st_mode
+        except FileNotFoundError:
+            mode = new_file_mode(directory)
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    if os.name != "nt":  # persist the rename
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class LoadThread(QThread):
+    progress = pyqtSignal("qint64")  # bytes read, as files may be larger than 2 GiB
+    parsing = pyqtSignal()
+
+    def __init__(self, path, cache=None, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.cache = cache
+        self.size = 0
+        self.schema = None
+        self.cached = False
+        self.error = None
+
+    def run(self):
+        try:
+            stat = os.stat(self.path)
+            self.size = stat.st_size
+            if self.cache is not None:
+                self.schema = self.cache.get(self.path, stat)
+                if self.schema is not None:
+                    self.cached = True
+                    return
+            chunks = []
+            read = 0
+            with open(self.path, "rb") as f:
+                while chunk := f.read(CHUNK_SIZE):
+                    if self.isInterruptionRequested():
+                        return
+                    chunks.append(chunk)
+                    read += len(chunk)
+                    self.progress.emit(read)
+            self.parsing.emit()
+            self.schema = json.loads(b"".join(chunks).decode("utf-8"))
+            if self.cache is not None and not self.isInterruptionRequested():
+                self.cache.put(self.path, stat, self.schema)
+        except (OSError, UnicodeDecodeError, json.JSONDecodeError) as e:
+            self.error = str(e)
+
+
+class LoadDialog(QProgressDialog):
+    def __init__(self, path, cache=None, parent=None):
+        super().__init__(parent=parent)
+        self.setWindowTitle("Open")
+        self.setLabelText("Reading the schema...")
+        self.setRange(0, 1000)
+        self.setMinimumDuration(0)
+        self.setAutoClose(False)
+        self.setAutoReset(False)
+        self.thread_ = LoadThread(path, cache, self)
+        self.thread_.progress.connect(self.update_progress)
+        self.thread_.parsing.connect(self.start_parsing)
+        self.thread_.finished.connect(self.accept)
+        self.canceled.connect(self.thread_.requestInterruption)
+        self.thread_.start()
+
+    def load(self, delay=200):
+        # Shows the dialog only if loading takes longer than the delay in ms.
+        # Returns the thread, which has finished.
+        if not self.thread_.wait(delay):
+            self.exec()
+            self.thread_.wait()
+        return self.thread_
+
+    def update_progress(self, bytes_read):
+        self.setValue(round(1000 * bytes_read / max(self.thread_.size, 1)))
+
+    def start_parsing(self):
+        self.setLabelText("Parsing the schema...")
+        self.setRange(0, 0)  # busy indicator
+
+
+class SaveThread(QThread):
+    def __init__(self, schema, path, compact, cache=None, parent=None):
+        super().__init__(parent)
+        self.schema = schema  # snapshot which is not changed while saving
+        self.path = path
+        self.compact = compact
+        self.cache = cache
+        self.error = None
+
+    def run(self):
+        try:
+            write_atomic(self.path, self.schema, self.compact)
+        except (OSError, TypeError, ValueError) as e:
+            self.error = str(e)
+            return
+        if self.cache is not None:  # the saved schema is opened without parsing
+            try:
+                self.cache.put(self.path, os.stat(self.path), self.schema)
+            except OSError:
+                pass
@@ -0,0 +1,669 @@
+from urllib.parse import unquote
+
+from PyQt6.QtCore import QAbstractItemModel, QModelIndex, Qt, pyqtSignal
+from PyQt6.QtGui import QColor
+
+from history import History
+from schema_hash import SchemaHashes
+
+
+class SchemaNode:
+    __slots__ = ["parent", "key", "row", "schema", "children", "pointer", "base",
+                 "referenced"]
+
+    def __init__(self, parent, key, row, schema, base="", referenced=False):
+        self.parent = parent
+        self.key = key  # field name; None for the root and elements of array
+        self.row = row
+        self.schema = schema
+        self.children = None  # not fetched yet
+        self.pointer = self._pointer()  # JSON pointer of the subschema
+        self.base = base  # URI which $ref in the subschema is relative to
+        # Shown through a $ref of an ancestor, so not a part of the schema
+        self.referenced = referenced
+
+    def _pointer(self):
+        if self.parent is None:
+            return ""
+        return child_pointer(self.parent.pointer, self.key)
+
+    def is_element(self):
+        return self.parent is not None and self.key is None
+
+    def is_required(self):
+        if self.parent is None:
+            return True
+        if self.key is None:
+            return False
+        return self.key in self.parent.schema.get("required", [])
+
+    def is_descendant_of(self, node):
+        p = self
+        while p is not None:
+            if p is node:
+                return True
+            p = p.parent
+        return False
+
+    def path(self):
+        return pointer_to_path(self.pointer)
+
+
+class SchemaModel(QAbstractItemModel):
+    headers = ["Node", "", "Type", "Description"]
+    # JSON pointer and dict of a subschema whose own keywords have changed
+    schemaChanged = pyqtSignal(str, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.root = None
+        self.nodes = {}  # JSON pointer -> fetched node
+        self.revision = 0  # increased whenever the schema changes
+        self.errors = {}  # id of subschema -> (subschema, meta-schema error)
+        self.history = History()
+        self.shared = {}  # id -> [subschema, number of parents], copy on write
+        # id -> subschema which has been replaced by its clone somewhere, whose
+        # subschemas are shared with the clone
+        self.cloned = {}
+        self.workspace = None  # Workspace which $ref to other files is resolved in
+        self.base_uri = ""  # of the schema in the workspace
+        # id of subschema -> (subschema, description of the cost of validation,
+        # share of the self time)
+        self.costs = {}
+        self.hashes = SchemaHashes()  # Merkle hashes of the schema and its parts
+
+    def set_schema(self, schema):
+        self.revision += 1
+        self.beginResetModel()
+        self.root = SchemaNode(None, None, 0, schema, self.base_uri)
+        self.nodes = {"": self.root}
+        self.errors = {}
+        self.costs = {}
+        self.history.clear()
+        self.shared = {}
+        self.cloned = {}
+        self.hashes.clear()
+        self.endResetModel()
+
+    def digest(self):
+        # Hash of the content of the schema, which is the same for an equal schema
+        return self.hashes.digest(self.root.schema)
+
+    # Qt model interface
+    def index(self, row, column, parent=QModelIndex()):
+        if not parent.isValid():
+            if row != 0 or self.root is None:
+                return QModelIndex()
+            return self.createIndex(0, column, self.root)
+        node = parent.internalPointer()
+        if node.children is None or not 0 <= row < len(node.children):
+            return QModelIndex()
+        return self.createIndex(row, column, node.children[row])
+
+    def parent(self, index=None):
+        if index is None:  # QObject.parent()
+            return super().parent()
+        if not index.isValid():
+            return QModelIndex()
+        node = index.internalPointer().parent
+        if node is None:
+            return QModelIndex()
+        return self.createIndex(node.row, 0, node)
+
+    def rowCount(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return int(self.root is not None)
+        if parent.column() > 0:
+            return 0
+        children = parent.internalPointer().children
+        return 0 if children is None else len(children)
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.headers)
+
+    def hasChildren(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return self.root is not None
+        if parent.column() > 0:
+            return False
+        node = parent.internalPointer()
+        if node.children is not None:
+            return len(node.children) > 0
+        return len(self.entries(node)[0]) > 0
+
+    def canFetchMore(self, parent):
+        return parent.isValid() and parent.internalPointer().children is None
+
+    def fetchMore(self, parent):
+        self.fetch(parent.internalPointer())
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        if role == Qt.ItemDataRole.ToolTipRole:
+            tips = [self.error_of(node), self.cost_of(node)[0], node.schema.get("$ref")]
+            return "\n".join(tip for tip in tips if isinstance(tip, str)) or None
+        if role == Qt.ItemDataRole.ForegroundRole:
+            if self.error_of(node) is not None:
+                return QColor(Qt.GlobalColor.red)
+            elif node.referenced:  # read only
+                return QColor(Qt.GlobalColor.gray)
+            return None
+        if role == Qt.ItemDataRole.BackgroundRole:
+            share = self.cost_of(node)[1]
+            if share is None:
+                return None
+            return QColor(255, 140, 0, round(255 * share))  # heat map
+        if role not in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return None
+        match index.column():
+            case 0:
+                if node.parent is None:
+                    return "root"
+                elif node.key is None:
+                    return "<element>"
+                return node.key
+            case 1:
+                if node.is_element():
+                    return "E"
+                return "*" * node.is_required()
+            case 2:
+                if "type" not in node.schema.keys() and is_reference(node.schema):
+                    return "$ref"
+                return display_type(node.schema.get("type"))
+            case 3:
+                return node.schema.get("description", "")
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and \
+                role == Qt.ItemDataRole.DisplayRole:
+            return self.headers[section]
+        return None
+
+    # Loading
+    def index_of(self, node, column=0):
+        if node is None:
+            return QModelIndex()
+        return self.createIndex(node.row, column, node)
+
+    def fetch(self, node, recursive=False):
+        # References are not fetched recursively, as they may be cyclic
+        if node.children is None:
+            entries, base, referenced = self.entries(node)
+            if entries:
+                self.beginInsertRows(self.index_of(node), 0, len(entries) - 1)
+            node.children = [
+                SchemaNode(node, key, row, schema, base, referenced)
+                for row, (key, schema) in enumerate(entries)
+            ]
+            for child in node.children:
+                self.nodes[child.pointer] = child
+            if entries:
+                self.endInsertRows()
+        if recursive:
+            for child in node.children:
+                if not is_reference(child.schema):
+                    self.fetch(child, recursive=True)
+
+    def release(self, node):
+        if not node.children:
+            return
+        self.beginRemoveRows(self.index_of(node), 0, len(node.children) - 1)
+        for child in node.children:
+            self._unregister(child)
+        node.children = None
+        self.endRemoveRows()
+
+    # Path index
+    def _unregister(self, node):
+        del self.nodes[node.pointer]
+        for child in node.children or []:
+            self._unregister(child)
+
+    def _repoint(self, node):
+        del self.nodes[node.pointer]
+        node.pointer = node._pointer()
+        self.nodes[node.pointer] = node
+        for child in node.children or []:
+            self._repoint(child)
+
+    def node_at(self, pointer, nearest=False):
+        # With nearest, the deepest existing node along the pointer is returned
+        node = self.nodes.get(pointer)
+        if node is not None:
+            return node
+        # Fetch the nodes along the path, which are usually collapsed ones
+        node = self.root
+        path = pointer_to_path(pointer)
+        i = 0
+        while i < len(path):
+            self.fetch(node)
+            if path[i] == "items":
+                key = None
+                i += 1
+            else:  # "properties", field name
+                key = path[i + 1]
+                i += 2
+            try:
+                node = self.nodes[child_pointer(node.pointer, key)]
+            except KeyError:
+                if nearest:
+                    return node
+                raise KeyError(f"Pointer \"{pointer}\" is not in the schema.")
+        return node
+
+    def schema_at(self, pointer):
+        return self.node_at(pointer).schema
+
+    # References
+    def target(self, node):
+        # Returns the subschema which the $ref of the node refers to and the URI
+        # of its document, or None if it isn't resolved
+        if not is_reference(node.schema):
+            return None
+        ref = node.schema["$ref"]
+        if (ref == "#" or ref.startswith("#/")) and not node.referenced:
+            # Resolved in the schema being edited instead of the saved file
+            schema = resolve_pointer(self.root.schema, unquote(ref[1:]))
+            return None if schema is None else (schema, node.base)
+        if self.workspace is None:
+            return None
+        return self.workspace.resolve(ref, node.base)
+
+    def set_workspace(self, workspace, base_uri=""):
+        # Fetched references are resolved again in the workspace
+        self.workspace = workspace
+        self.base_uri = base_uri
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            node.base = base_uri
+            if is_reference(node.schema):
+                self._reset_children(node)
+            else:
+                stack.extend(node.children or [])
+
+    def entries(self, node):
+        # Returns (field name, subschema) of the children, the URI which $ref in
+        # them is relative to, and whether they are shown through a $ref. The
+        # referenced subschemas are shown without copying them.
+        target = self.target(node)
+        if target is None:
+            return child_entries(node), node.base, node.referenced
+        schema, base = target
+        return schema_entries(schema), base, True
+
+    # Validation costs
+    def cost_of(self, node):
+        # Returns (description, share of the time), which are None if unknown
+        schema, cost, share = self.costs.get(id(node.schema), (None, None, None))
+        return (cost, share) if schema is node.schema else (None, None)
+
+    def set_costs(self, costs):
+        self.layoutAboutToBeChanged.emit()
+        self.costs = costs
+        self.layoutChanged.emit()
+
+    # Meta-schema errors
+    def error_of(self, node):
+        schema, error = self.errors.get(id(node.schema), (None, None))
+        return error if schema is node.schema else None
+
+    def set_errors(self, results, full=False):
+        # results: (subschema, path, error message or None)
+        if full:
+            self.layoutAboutToBeChanged.emit()
+            self.errors = {}
+        for schema, path, error in results:
+            if error is None:
+                self.errors.pop(id(schema), None)
+            else:
+                self.errors[id(schema)] = (schema, error)
+            if not full:
+                node = self.nodes.get(path_to_pointer(path))
+                if node is not None:
+                    self.dataChanged.emit(
+                        self.index_of(node, 0), self.index_of(node, 3))
+        if full:
+            self.layoutChanged.emit()
+
+    # Editing
+    # Every change of the schema goes through these methods, which record the
+    # inverse operations for undo
+    def _changed(self, pointer, schema):
+        self.revision += 1
+        self.hashes.invalidate(self.root.schema, pointer_to_path(pointer))
+        self.schemaChanged.emit(pointer, schema)
+
+    def _inserted(self, pointer, schema):
+        # Every subschema of an inserted subtree is new to the listeners
+        self.revision += 1
+        self.hashes.invalidate(self.root.schema, pointer_to_path(pointer))
+        for p, subschema in iter_subschemas(pointer, schema):
+            self.schemaChanged.emit(p, subschema)
+
+    # Copy on write
+    def share(self, schema):
+        # The subschema is about to be referred by one more parent
+        entry = self.shared.setdefault(id(schema), [schema, 1])
+        entry[1] += 1
+
+    def _own(self, node):
+        # Clones the shared subschemas along the path from the root to the node,
+        # so that the change is made only here
+        path = []
+        while node is not None:
+            path.append(node)
+            node = node.parent
+        for node in reversed(path):
+            if id(node.schema) in self.shared:
+                self._clone(node)
+
+    def _shallow_copy(self, schema):
+        # Subschemas are shared by the original and the copy until changed
+        copy = dict(schema)
+        if isinstance(schema.get("properties"), dict):
+            copy["properties"] = dict(schema["properties"])
+            for property_ in copy["properties"].values():
+                self.share(property_)
+        if isinstance(schema.get("items"), dict):
+            self.share(schema["items"])
+        return copy
+
+    def snapshot(self):
+        # A copy of the schema which later edits don't change, e.g. to be
+        # saved on another thread. Release it when it's no longer used, or the
+        # edits keep cloning the subschemas it shares.
+        return self._shallow_copy(self.root.schema)
+
+    def release_snapshot(self, snapshot):
+        # The subschemas of the snapshot have one parent less. A subschema which
+        # has been cloned since had the snapshot as its last parent, so its own
+        # subschemas, which it shares with the clone, have one parent less in
+        # turn.
+        stack = [snapshot]
+        while stack:
+            schema = stack.pop()
+            if isinstance(schema.get("properties"), dict):
+                children = list(schema["properties"].values())
+            else:
+                children = []
+            if isinstance(schema.get("items"), dict):
+                children.append(schema["items"])
+            for child in children:
+                entry = self.shared.get(id(child))
+                if entry is not None and entry[0] is child:
+                    entry[1] -= 1
+                    if entry[1] <= 1:
+                        del self.shared[id(child)]
+                elif self.cloned.get(id(child)) is child:
+                    del self.cloned[id(child)]
+                    stack.append(child)
+
+    def _clone(self, node):
+        schema = node.schema
+        entry = self.shared[id(schema)]
+        entry[1] -= 1
+        if entry[1] <= 1:
+            del self.shared[id(schema)]
+        self.cloned[id(schema)] = schema
+        clone = self._shallow_copy(schema)
+        if node.key is None:
+            node.parent.schema["items"] = clone
+        else:
+            node.parent.schema["properties"][node.key] = clone
+        node.schema = clone
+        self.schemaChanged.emit(node.pointer, clone)
+
+    def _reset_children(self, node):
+        fetched = node.children is not None
+        self.release(node)
+        node.children = None
+        if fetched:
+            self.fetch(node)
+
+    def set_keywords(self, node, keywords, order=None):
+        # A keyword whose value is None is removed from the schema. order is the
+        # order of keywords to restore.
+        self._own(node)
+        schema = node.schema
+        container = child_container(schema)
+        old_order = list(schema)
+        old = {}
+        for key, value in keywords.items():
+            if value is None:
+                if key in schema.keys():
+                    old[key] = schema.pop(key)
+            elif key not in schema.keys() or (
+                    schema[key] is not value and schema[key] != value):
+                old[key] = schema.get(key)
+                schema[key] = value
+        if not old:
+            return
+        if order is not None:
+            reorder(schema, order)
+        self.history.record(
+            "set_keywords", node.pointer, old,
+            old_order if list(schema) != old_order else None)
+        self._changed(node.pointer, schema)
+        if isinstance(schema.get("items"), dict) and "items" in old:
+            self._inserted(child_pointer(node.pointer, None), schema["items"])
+        if isinstance(schema.get("properties"), dict) and "properties" in old:
+            for field_name, property_ in schema["properties"].items():
+                self._inserted(child_pointer(node.pointer, field_name), property_)
+        if child_container(schema) != container or container in old:
+            self._reset_children(node)
+        elif "required" in old and node.children:
+            self.dataChanged.emit(self.index_of(node.children[0], 1),
+                                  self.index_of(node.children[-1], 1))
+        self.dataChanged.emit(self.index_of(node, 0), self.index_of(node, 3))
+
+    def set_required(self, node, required):
+        required_list = node.parent.schema.get("required", [])
+        if required and node.key not in required_list:
+            required_list = required_list + [node.key]
+        elif not required and node.key in required_list:
+            required_list = [k for k in required_list if k != node.key]
+        else:
+            return
+        self.set_keywords(node.parent, {"required": required_list})
+
+    def rename_node(self, node, field_name):
+        self._own(node.parent)
+        parent_schema = node.parent.schema
+        old_field_name = node.key
+        # Keep the field at its position among siblings
+        parent_schema["properties"] = {
+            field_name if k == old_field_name else k: v
+            for k, v in parent_schema["properties"].items()
+        }
+        if old_field_name in parent_schema.get("required", []):
+            parent_schema["required"] = [
+                field_name if k == old_field_name else k
+                for k in parent_schema["required"]
+            ]
+        node.key = field_name
+        self._changed(node.parent.pointer, parent_schema)
+        self._repoint(node)
+        self.history.record("rename_node", node.pointer, old_field_name)
+        self.dataChanged.emit(self.index_of(node, 0), self.index_of(node, 1))
+
+    def insert_property(self, node, field_name, schema, position=None, new=True):
+        # The schema must have "properties" without this field. new is False if
+        # the subschemas are known to the listeners, when they are moved or
+        # shared. Returns the new node, or None if the children are not fetched.
+        self._own(node)
+        properties = node.schema["properties"]
+        if position is None or position >= len(properties):
+            position = len(properties)
+            properties[field_name] = schema
+        else:
+            order = list(properties)
+            order.insert(position, field_name)
+            properties[field_name] = schema
+            reorder(properties, order)
+        self.history.record("remove_property", node.pointer, field_name)
+        self._changed(node.pointer, node.schema)
+        if new:
+            self._inserted(child_pointer(node.pointer, field_name), schema)
+        else:
+            self._changed(child_pointer(node.pointer, field_name), schema)
+        if node.children is None:
+            return None
+        self.beginInsertRows(self.index_of(node), position, position)
+        child = SchemaNode(node, field_name, position, schema, node.base)
+        node.children.insert(position, child)
+        for row in range(position + 1, len(node.children)):
+            node.children[row].row = row
+        self.nodes[child.pointer] = child
+        self.endInsertRows()
+        return child
+
+    def remove_property(self, node, field_name):
+        # "required" is kept as is
+        self._own(node)
+        properties = node.schema["properties"]
+        position = list(properties).index(field_name)
+        schema = properties.pop(field_name)
+        self.history.record(
+            "insert_property", node.pointer, field_name, schema, position)
+        self._changed(node.pointer, node.schema)
+        if node.children is None:
+            return
+        self.beginRemoveRows(self.index_of(node), position, position)
+        self._unregister(node.children.pop(position))
+        for row in range(position, len(node.children)):
+            node.children[row].row = row
+        self.endRemoveRows()
+
+    def add_property(self, node, field_name, schema, required=False, new=True):
+        # A property of the same name is replaced at its position
+        with self.history.edit("Add"):
+            position = None
+            if "properties" not in node.schema.keys():
+                self.set_keywords(node, {"properties": {}})
+            elif field_name in node.schema["properties"]:
+                position = list(node.schema["properties"]).index(field_name)
+                self.remove_property(node, field_name)
+            child = self.insert_property(node, field_name, schema, position, new)
+            required_list = node.schema.get("required", [])
+            if required and field_name not in required_list:
+                self.set_keywords(node, {"required": required_list + [field_name]})
+        return child
+
+    def add_items(self, node, schema):
+        self.set_keywords(node, {"items": schema})
+
+    def remove_node(self, node):
+        parent = node.parent
+        with self.history.edit("Delete"):
+            if node.key is None:
+                self.set_keywords(parent, {"items": None})
+                return
+            required_list = parent.schema.get("required", [])
+            if node.key in required_list:
+                self.set_keywords(
+                    parent, {"required": [k for k in required_list if k != node.key]})
+            self.remove_property(parent, node.key)
+
+
+def escape_pointer_token(token):
+    return token.replace("~", "~0").replace("/", "~1")
+
+
+def child_pointer(pointer, key):
+    # key is a field name, or None for the element of array
+    if key is None:
+        return pointer + "/items"
+    return pointer + "/properties/" + escape_pointer_token(key)
+
+
+def path_to_pointer(path):
+    return "".join("/" + escape_pointer_token(str(p)) for p in path)
+
+
+def pointer_to_path(pointer):
+    if not pointer:
+        return []
+    return [
+        p.replace("~1", "/").replace("~0", "~") for p in pointer[1:].split("/")
+    ]
+
+
+def reorder(schema, order):
+    # Reorders keys in place, keeping the identity of the dict. Keys not in
+    # order are kept after the others.
+    keys = [k for k in order if k in schema.keys()]
+    ordered = set(keys)
+    items = [(k, schema[k]) for k in keys]
+    items += [(k, v) for k, v in schema.items() if k not in ordered]
+    schema.clear()
+    schema.update(items)
+
+
+def iter_subschemas(pointer, schema):
+    stack = [(pointer, schema)]
+    while stack:
+        pointer, schema = stack.pop()
+        if not isinstance(schema, dict):
+            continue
+        yield pointer, schema
+        if isinstance(schema.get("items"), dict):
+            stack.append((child_pointer(pointer, None), schema["items"]))
+        if isinstance(schema.get("properties"), dict):
+            for field_name, property_ in schema["properties"].items():
+                stack.append((child_pointer(pointer, field_name), property_))
+
+
+def child_container(property_):
+    # The schema keyword whose content is shown as children in the tree
+    if "properties" in property_.keys():
+        return "properties"
+    elif "items" in property_.keys():
+        return "items"
+    return None
+
+
+def is_reference(schema):
+    # Keywords beside $ref are ignored in draft 7, but children are shown
+    return isinstance(schema.get("$ref"), str) and child_container(schema) is None
+
+
+def resolve_pointer(schema, pointer):
+    # Returns None if the pointer is not in the schema
+    for token in pointer_to_path(pointer):
+        if isinstance(schema, dict) and token in schema.keys():
+            schema = schema[token]
+        elif isinstance(schema, list) and token.isdigit() and int(token) < len(schema):
+            schema = schema[int(token)]
+        else:
+            return None
+    return schema
+
+
+def schema_entries(schema, root=False):
+    if not isinstance(schema, dict):
+        return []
+    match child_container(schema):
+        case "properties":
+            return list(schema["properties"].items())
+        case "items" if not root:  # root shows properties only
+            return [(None, schema["items"])]
+    return []
+
+
+def child_entries(node):
+    return schema_entries(node.schema, node.parent is None)
+
+
+def display_type(type_) -> str:
+    if type_ is None:
+        return ""
+    elif isinstance(type_, str):
+        return type_
+    elif isinstance(type_, list):
+        return " | ".join(type_)
+    else:
+        raise ValueError(f"JSON schema is invalid: field type \"{type_}\" is invalid.")
@@ -0,0 +1,146 @@
+import re
+from bisect import bisect_right
+from itertools import accumulate
+
+from schema_model import child_pointer, schema_entries
+
+FIELDS = ("name", "description", "type", "format", "pattern")
+
+
+def schema_terms(name, schema):
+    # (field, lowercase value) of a subschema, with a term per type
+    terms = [] if name is None else [("name", name.lower())]
+    if not isinstance(schema, dict):
+        return terms
+    for field in ("type", "description", "format", "pattern"):
+        value = schema.get(field)
+        if isinstance(value, str):
+            terms.append((field, value.lower()))
+        elif field == "type" and isinstance(value, list):
+            terms.extend(("type", t.lower()) for t in set(value) if isinstance(t, str))
+    return terms
+
+
+class FieldIndex:
+    def __init__(self):
+        self.postings = {}  # token -> JSON pointers
+        # The tokens joined by NUL, so that a query scans them in one pass. They
+        # are joined again for the first query after the tokens change.
+        self.tokens = None
+        self.text = ""
+        self.offsets = None  # of the tokens in the text
+
+    def add(self, token, pointer):
+        postings = self.postings.get(token)
+        if postings is None:
+            postings = self.postings[token] = set()
+            self.tokens = None
+        postings.add(pointer)
+
+    def remove(self, token, pointer):
+        postings = self.postings[token]
+        postings.discard(pointer)
+        if not postings:
+            del self.postings[token]
+            self.tokens = None
+
+    def match(self, pattern):
+        # Returns the tokens which the regular expression matches
+        if self.tokens is None:
+            self.tokens = list(self.postings)
+            self.text = "\0".join(self.tokens)
+            self.offsets = list(accumulate((len(t) + 1 for t in self.tokens), initial=0))
+        offsets = self.offsets
+        found = dict.fromkeys(bisect_right(offsets, m.start()) - 1
+                              for m in pattern.finditer(self.text))
+        return [self.tokens[i] for i in found]
+
+
+class SearchIndex:
+    # Inverted index of the subschemas shown in the tree, by JSON pointer. It is
+    # built once and then updated from SchemaModel.schemaChanged, which is
+    # emitted for every changed or inserted subschema.
+    def __init__(self):
+        self.fields = {field: FieldIndex() for field in FIELDS}
+        self.terms = {}  # pointer -> terms of the subschema
+        self.names = {}  # pointer -> field name, None for elements of array
+        self.children = {}  # pointer -> pointers of the children
+        self.schema = None  # indexed
+
+    def build(self, schema):
+        self.__init__()
+        self.schema = schema
+        self._add(None, "", schema)
+
+    def _add(self, name, pointer, schema):
+        fields = self.fields
+        stack = [(name, pointer, schema)]
+        while stack:
+            name, pointer, schema = stack.pop()
+            self.names[pointer] = name
+            self.terms[pointer] = terms = schema_terms(name, schema)
+            for field, token in terms:
+                fields[field].add(token, pointer)
+            children = []
+            for key, subschema in schema_entries(schema, pointer == ""):
+                p = child_pointer(pointer, key)
+                children.append(p)
+                stack.append((key, p, subschema))
+            self.children[pointer] = children
+
+    def _remove(self, pointer):
+        stack = [pointer]
+        while stack:
+            pointer = stack.pop()
+            del self.names[pointer]
+            for field, token in self.terms.pop(pointer):
+                self.fields[field].remove(token, pointer)
+            stack.extend(self.children.pop(pointer))
+
+    def update(self, pointer, schema):
+        # Subschemas which aren't shown in the tree are ignored
+        if pointer not in self.terms:
+            return
+        terms = schema_terms(self.names[pointer], schema)
+        new, old = set(terms), set(self.terms[pointer])
+        for field, token in old - new:
+            self.fields[field].remove(token, pointer)
+        for field, token in new - old:
+            self.fields[field].add(token, pointer)
+        self.terms[pointer] = terms
+        # Children which are renamed, moved, added or removed
+        entries = {child_pointer(pointer, key): (key, subschema)
+                   for key, subschema in schema_entries(schema, pointer == "")}
+        for p in self.children[pointer]:
+            if p not in entries:
+                self._remove(p)
+        for p, (key, subschema) in entries.items():
+            if p not in self.terms:
+                self._add(key, p, subschema)
+        self.children[pointer] = list(entries)
+
+    def search(self, query):
+        # Returns the pointers matching every word of the query. A word matches
+        # any part of a value, or the start of a word in it if it ends with "*".
+        # "field:word" matches the field only, e.g. "type:string".
+        result = None
+        for word in query.lower().split():
+            field, colon, text = word.partition(":")
+            if colon and field in self.fields:
+                indexes = [self.fields[field]]
+            else:
+                indexes = self.fields.values()
+                text = word
+            pattern = re.escape(text.rstrip("*"))
+            if not text.rstrip("*"):
+                continue
+            if text.endswith("*"):
+                pattern = r"(?<!\w)" + pattern
+            pattern = re.compile(pattern)
+            pointers = set()
+            for index in indexes:
+                pointers.update(*[index.postings[t] for t in index.match(pattern)])
+            result = pointers if result is None else result & pointers
+            if not result:
+                break
+        return result or set()
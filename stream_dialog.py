@@ -0,0 +1,78 @@
+import json
+import os
+import time
+
+from PyQt6.QtCore import QThread, pyqtSignal
+from PyQt6.QtWidgets import *
+
+from validation import ErrorReport, iter_stream_errors
+
+
+class StreamValidationThread(QThread):
+    # bytes read, records validated; qint64 as files may be larger than 2 GiB
+    progress = pyqtSignal("qint64", "qint64")
+
+    def __init__(self, validator, fp, jsonl, max_errors, parent=None):
+        super().__init__(parent)
+        self.validator = validator
+        self.fp = fp
+        self.jsonl = jsonl
+        self.report = ErrorReport(max_errors)
+        self.n_records = 0
+        self.n_invalid = 0  # records
+        self.n_errors = 0  # of the records
+        self.n_root_errors = 0  # of the root array, such as minItems
+        self.parse_error = None
+
+    def run(self):
+        last_report = time.perf_counter()
+        with open(self.fp, "rb") as f:
+            try:
+                for position, errors in iter_stream_errors(
+                        self.validator, f, self.jsonl):
+                    if self.isInterruptionRequested():
+                        return
+                    if position is None:  # errors of the root array
+                        self.n_root_errors += len(errors)
+                        self.report.extend(errors)
+                        continue
+                    self.n_records += 1
+                    if errors:
+                        self.n_invalid += 1
+                        self.n_errors += len(errors)
+                        if self.jsonl:
+                            self.report.extend(errors, line=position)
+                        else:
+                            self.report.extend(
+                                errors, path=(position,), schema_path=("items",))
+                    now = time.perf_counter()
+                    if now - last_report > 0.1:
+                        self.progress.emit(f.tell(), self.n_records)
+                        last_report = now
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                self.parse_error = str(e)
+
+
+class StreamValidationDialog(QProgressDialog):
+    def __init__(self, validator, fp, jsonl=False, max_errors=None, parent=None):
+        super().__init__(parent=parent)
+        self.setWindowTitle("Validator")
+        self.setLabelText("Validating records...")
+        self.setRange(0, 1000)
+        self.setMinimumDuration(0)
+        self.setAutoClose(False)
+        self.setAutoReset(False)
+        self.size_ = max(os.path.getsize(fp), 1)
+        self.start_time = time.perf_counter()
+        self.thread_ = StreamValidationThread(validator, fp, jsonl, max_errors, self)
+        self.thread_.progress.connect(self.update_progress)
+        self.thread_.finished.connect(self.accept)
+        self.canceled.connect(self.thread_.requestInterruption)
+        self.thread_.start()
+
+    def update_progress(self, bytes_read, n_records):
+        self.setValue(round(1000 * bytes_read / self.size_))
+        speed = n_records / max(time.perf_counter() - self.start_time, 1e-6)
+        self.setLabelText(
+            f"{n_records:,} records, {speed:,.0f} records/s, "
+            f"{self.thread_.n_invalid:,} invalid")
@@ -1,48 +1,106 @@
-from itertools import product
+from collections.abc import Sequence
+from itertools import islice
 
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt
 from PyQt6.QtWidgets import *
 
+BATCH_SIZE = 1000
+SAMPLE_SIZE = 100  # rows measured to size a column
+
+
+class TableModel(QAbstractTableModel):
+    # Rows of a sequence or an iterator are fetched in batches while scrolling
+    def __init__(self, data, columns=None, indices=None, parent=None):
+        super().__init__(parent)
+        if isinstance(data, Sequence):
+            self.rows = data
+            self.source = None
+        else:
+            self.rows = []
+            self.source = iter(data)
+        self.loaded = 0
+        self.columns = columns
+        self.indices = indices
+        self.n_columns = len(columns) if columns is not None else None
+        self.loaded = self._available()
+        if self.n_columns is None:
+            raise Exception("Argument 'columns' is not provided, and 'data' is empty. "
+                            "Cannot make a table.")
+
+    def _available(self):
+        # Number of rows of the next batch, which are read and checked here
+        if self.source is not None:
+            self.rows.extend(islice(self.source, BATCH_SIZE))
+            if len(self.rows) < self.loaded + BATCH_SIZE:
+                self.source = None  # exhausted
+        n = min(BATCH_SIZE, len(self.rows) - self.loaded)
+        for i in range(self.loaded, self.loaded + n):
+            row = self.rows[i]
+            if self.n_columns is None:
+                self.n_columns = len(row)
+            assert len(row) == self.n_columns, \
+                (f"Based on provided 'data' and 'columns', each row (element of "
+                 f"'data') must be of length {self.n_columns}.")
+        return n
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.loaded
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.n_columns
+
+    def canFetchMore(self, parent):
+        if parent.isValid():
+            return False
+        return self.source is not None or self.loaded < len(self.rows)
+
+    def fetchMore(self, parent):
+        n = self._available()
+        if n <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self.loaded, self.loaded + n - 1)
+        self.loaded += n
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        value = self.rows[index.row()][index.column()]
+        return None if value is None else str(value)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.columns[section] if self.columns is not None else section + 1
+        return self.indices[section] if self.indices is not None else section + 1
+
 
 class TableDialog(QDialog):
     def __init__(self, data, columns=None, indices=None):
         super().__init__()
-        m = len(data)
-        try:
-            n = len(columns or data[0])
-        except IndexError:
-            raise Exception("Argument 'columns' is not provided, and 'data' is empty. "
-                            "Cannot make a table.")
-        assert all(len(data[i]) == n for i in range(m)), \
-            (f"Based on provided 'data' and 'columns', each row (element of 'data') "
-             f"must be of length {n}.")
+        model = TableModel(data, columns, indices, self)
+        m = model.rowCount()
+        n = model.columnCount()
 
         layout = QVBoxLayout()
-        table = QTableWidget()
-        table.setRowCount(m)
-        table.setColumnCount(n)
-        for i, j in product(range(m), range(n)):
-            value = data[i][j]
-            if value is None:
-                continue
-            cell = QTableWidgetItem(str(value))
-            table.setItem(i, j, cell)
-        if indices is not None:
-            table.setVerticalHeaderLabels(indices)
-        if columns is not None:
-            table.setHorizontalHeaderLabels(columns)
+        table = QTableView()
+        table.setModel(model)
+        table.setWordWrap(False)
+        # Columns are sized from a sample of rows, and rows keep the default height
+        table.horizontalHeader().setResizeContentsPrecision(SAMPLE_SIZE)
         table.resizeColumnsToContents()
         scroll_bar_w = table.style().pixelMetric(QStyle.PixelMetric.PM_ScrollBarExtent)
         edge_w = table.frameWidth() * 2
         natural_width = (sum(table.columnWidth(j) for j in range(n))
-                         + table.verticalHeader().width()
+                         + table.verticalHeader().sizeHint().width()
                          + scroll_bar_w
                          + edge_w)
-        natural_height = (sum(table.rowHeight(i) for i in range(m))
-                          + table.horizontalHeader().height()
+        natural_height = (m * table.verticalHeader().defaultSectionSize()
+                          + table.horizontalHeader().sizeHint().height()
                           + scroll_bar_w
                           + edge_w)
 
-
         screen_size = self.screen().size()
         desired_table_width = round(0.3 * screen_size.width())
         desired_table_height = round(0.5 * screen_size.height())
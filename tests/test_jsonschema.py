@@ -3,19 +3,14 @@ from operator import attrgetter
 
 import jsonschema
 
+from validation import format_path
+
 with open("tests/json_schema/invalid_schema.json") as f:
     invalid_schema = json.load(f)
 try:
     jsonschema.Draft7Validator.check_schema(invalid_schema)
 except jsonschema.exceptions.SchemaError as e:
-    path_str = "schema"
-    for p in e.path:
-        if isinstance(p, str):
-            p_ = "\"" + p + "\""
-        else:
-            p_ = str(p)
-        path_str += "[" + p_ + "]"
-    print(f"At {path_str}, {e.message}.")
+    print(f"At {format_path(e.path, 'schema')}, {e.message}.")
 
 
 with open("tests/json_schema/user_profile.json") as f:
@@ -23,14 +18,7 @@ with open("tests/json_schema/user_profile.json") as f:
 try:
     jsonschema.Draft7Validator.check_schema(user_profile)
 except jsonschema.exceptions.SchemaError as e:
-    path_str = "schema"
-    for p in e.path:
-        if isinstance(p, str):
-            p_ = "\"" + p + "\""
-        else:
-            p_ = str(p)
-        path_str += "[" + p_ + "]"
-    print(f"At {path_str}, {e.message}.")
+    print(f"At {format_path(e.path, 'schema')}, {e.message}.")
 
 
 validator = jsonschema.Draft7Validator(user_profile)
@@ -42,11 +30,4 @@ with open("tests/json_instance/invalid_data.json") as f:
     invalid_data = json.load(f)
 errors = sorted(validator.iter_errors(invalid_data), key=attrgetter('path'))
 for e in errors:
-    path_str = "$"
-    for p in e.path:
-        if isinstance(p, str):
-            p_ = "\"" + p + "\""
-        else:
-            p_ = str(p)
-        path_str += "[" + p_ + "]"
-    print(f"At {path_str}, {e.message}.")
+    print(f"At {format_path(e.path)}, {e.message}.")
@@ -0,0 +1,43 @@
+import os
+import sys
+import tempfile
+
+from schema_editor import main
+
+# Valid data.
+code = main(["validate", "tests/json_schema/user_profile.json",
+             "tests/json_instance/user_profile_valid.json"])
+print("[1] PASS" if code == 0 else "[1] FAIL")
+
+# Invalid data, machine-readable output.
+code = main(["validate", "tests/json_schema/user_profile.json",
+             "tests/json_instance/user_profile_invalid.json", "--format", "json"])
+print("[2] PASS" if code == 1 else "[2] FAIL")
+
+# Invalid schema.
+code = main(["check", "tests/json_schema/invalid_type.json"])
+print("[3] PASS" if code == 2 else "[3] FAIL")
+
+# Qt is never imported.
+print("[4] FAIL" if any(m.startswith("PyQt6") for m in sys.modules) else "[4] PASS")
+
+# $ref to the other schemas of a workspace, including by $id.
+code = main(["validate", "tests/json_schema/workspace/order.json",
+             "tests/json_instance/order_invalid.json",
+             "--workspace", "tests/json_schema/workspace", "--format", "json"])
+print("[5] PASS" if code == 1 else "[5] FAIL")
+
+# Costs of subschemas and keywords.
+code = main(["profile", "tests/json_schema/user_profile.json",
+             "tests/json_instance/user_profile_invalid.json", "--top", "3"])
+print("[6] PASS" if code == 0 else "[6] FAIL")
+
+# Generated data, valid, then a tenth of it invalid.
+schema = "tests/json_schema/user_profile.json"
+path = os.path.join(tempfile.mkdtemp(), "data.jsonl")
+codes = [main(["generate", schema, path, "-n", "200", "--processes", "1"]),
+         main(["validate", schema, path]),
+         main(["generate", schema, path, "-n", "200", "--invalid-rate", "0.1",
+               "--processes", "1"]),
+         main(["validate", schema, path])]
+print("[7] PASS" if codes == [0, 0, 0, 1] else "[7] FAIL")
@@ -0,0 +1,31 @@
+import copy
+import json
+
+from schema_diff import diff_schemas
+from schema_hash import SchemaHashes
+
+with open("tests/json_schema/user_profile.json", "r", encoding="utf-8") as f:
+    schema = json.load(f)
+hashes = SchemaHashes()
+digest = hashes.digest(schema)
+
+# Equal content, equal digest.
+print("[1] PASS" if SchemaHashes().digest(copy.deepcopy(schema)) == digest
+      else "[1] FAIL")
+
+# A change in place is hashed again along its path only.
+schema["properties"]["userId"]["description"] = "Changed"
+hashes.invalidate(schema, ["properties", "userId"])
+changed = hashes.digest(schema)
+print("[2] PASS" if changed != digest and changed == SchemaHashes().digest(schema)
+      else "[2] FAIL")
+
+# Differences from the original, skipping equal subtrees.
+with open("tests/json_schema/user_profile.json", "r", encoding="utf-8") as f:
+    original = json.load(f)
+del schema["properties"]["username"]
+differences = list(diff_schemas(original, schema, SchemaHashes(), hashes))
+print("[3] PASS" if [d[:3] for d in differences] == [
+    ("/properties/username", None, "removed"),
+    ("/properties/userId", "description", "changed"),
+] else "[3] FAIL")
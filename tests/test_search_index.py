@@ -0,0 +1,22 @@
+import json
+
+from search_index import SearchIndex
+
+with open("tests/json_schema/user_profile.json", "r", encoding="utf-8") as f:
+    schema = json.load(f)
+index = SearchIndex()
+index.build(schema)
+
+# Substring, prefix and field queries.
+print("[1] PASS" if index.search("mail") else "[1] FAIL")
+print("[2] PASS" if index.search("type:string") else "[2] FAIL")
+print("[3] PASS" if not index.search("zzzz") else "[3] FAIL")
+
+# Updates in place match a rebuilt index.
+schema["properties"]["renamed"] = {"type": "integer", "description": "Quux count"}
+index.update("", schema)
+rebuilt = SearchIndex()
+rebuilt.build(schema)
+print("[4] PASS" if index.terms == rebuilt.terms and
+      index.search("quux*") == rebuilt.search("quux*") == {"/properties/renamed"}
+      else "[4] FAIL")
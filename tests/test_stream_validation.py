@@ -0,0 +1,43 @@
+import io
+import json
+
+from validation import iter_stream_errors, make_validator, stream_blockers
+
+
+def streamed(schema, data):
+    f = io.BytesIO(json.dumps(data).encode("utf-8"))
+    return [error for _, errors in iter_stream_errors(make_validator(schema), f)
+            for error in errors]
+
+
+def full(schema, data):
+    return list(make_validator(schema).iter_errors(data))
+
+
+# Root keywords other than items are checked as well.
+schema = {"type": "object", "properties": {"a": {"type": "integer"}}}
+data = [1, 2, {"a": 3}]
+print("[1] PASS" if full(schema, data) and
+      [e.validator for e in streamed(schema, data)] == ["type"] else "[1] FAIL")
+
+# Elements and the number of elements, as in full validation.
+schema = {"type": "array", "items": {"type": "integer"}, "maxItems": 2}
+data = [1, "2", 3]
+print("[2] PASS" if sorted(e.validator for e in streamed(schema, data)) ==
+      sorted(e.validator for e in full(schema, data)) == ["maxItems", "type"]
+      else "[2] FAIL")
+
+# Keywords which need the whole array are not streamed.
+schema = {"type": "array", "uniqueItems": True}
+print("[3] PASS" if stream_blockers(schema) == ["uniqueItems"] and full(schema, [1, 1])
+      else "[3] FAIL")
+try:
+    streamed(schema, [1, 1])
+    print("[4] FAIL")
+except ValueError:
+    print("[4] PASS")
+
+# Valid data has no errors either way.
+schema = {"type": ["array", "object"], "items": {"type": "integer"}, "minItems": 1}
+print("[5] PASS" if not streamed(schema, [1, 2]) and not full(schema, [1, 2])
+      else "[5] FAIL")
@@ -0,0 +1,18 @@
+import sys
+
+sys.path.insert(0, "benchmarks")
+
+from synthetic import SHAPES, generate
+from validation import check_schema, make_validator
+
+# Every shape is a valid schema, and its data fits it.
+ok = True
+for shape in SHAPES:
+    schema, instance = generate(shape, 20)
+    ok = ok and check_schema(schema) is None and \
+        not list(make_validator(schema).iter_errors(instance))
+print("[1] PASS" if ok else "[1] FAIL")
+
+# The same seed gives the same schema.
+print("[2] PASS" if generate("array", 20, 1) == generate("array", 20, 1) and
+      generate("array", 20, 1) != generate("array", 20, 2) else "[2] FAIL")
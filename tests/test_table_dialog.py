@@ -9,3 +9,10 @@ dialog = TableDialog(
     # indices auto 1..N
 )
 dialog.exec()
+
+# Rows from an iterator are read while scrolling
+dialog = TableDialog(
+    columns=["Index", "Square"],
+    data=((i, i * i) for i in range(500_000)),
+)
+dialog.exec()
@@ -0,0 +1,72 @@
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import *
+
+
+def milliseconds(seconds):
+    return f"{seconds * 1000:,.1f}"
+
+
+class TracePanel(QDockWidget):
+    # The latest traced actions, the last one first, with their phases as children
+    def __init__(self, tracer, parent=None):
+        super().__init__("Trace", parent)
+        self.tracer = tracer
+        widget = QWidget()
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        widget.setLayout(layout)
+        self.log_label = QLabel()
+        self.log_label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        layout.addWidget(self.log_label)
+        self.tree = QTreeWidget()
+        self.tree.setHeaderLabels(
+            ["Action", "Time (ms)", "Allocated (KiB)", "Nodes", "At"])
+        self.tree.setUniformRowHeights(True)
+        layout.addWidget(self.tree)
+        clear = QPushButton("Clear")
+        clear.clicked.connect(self.clear)
+        clear_layout = QHBoxLayout()
+        clear_layout.addStretch()
+        clear_layout.addWidget(clear)
+        layout.addLayout(clear_layout)
+        self.setWidget(widget)
+        for record in tracer.records:
+            self.add(record)
+        tracer.listeners.append(self.add)
+        self.update_log_label()
+
+    def update_log_label(self):
+        if not self.tracer.enabled:
+            self.log_label.setText("Tracing is off. Turn it on in the Trace menu.")
+        elif self.tracer.path is None:
+            self.log_label.setText("Tracing. The log cannot be written.")
+        else:
+            self.log_label.setText(f"Tracing to {self.tracer.path}")
+
+    def add(self, record):
+        allocated = record.get("allocated")
+        item = QTreeWidgetItem([
+            record["action"] + (f" ({record['error']})" if "error" in record else ""),
+            milliseconds(record["duration"]),
+            "" if allocated is None else f"{allocated / 1024:,.0f}",
+            f"{record['nodes']:,}" if "nodes" in record else "",
+            record["time"].partition("T")[2],
+        ])
+        parents = [item]  # by depth
+        for phase in record["phases"]:
+            child = QTreeWidgetItem([phase["name"], milliseconds(phase["duration"])])
+            child.setTextAlignment(1, Qt.AlignmentFlag.AlignRight)
+            del parents[phase["depth"] + 1:]
+            parents[-1].addChild(child)
+            parents.append(child)
+        for column in range(1, 4):
+            item.setTextAlignment(column, Qt.AlignmentFlag.AlignRight)
+        self.tree.insertTopLevelItem(0, item)
+        while self.tree.topLevelItemCount() > self.tracer.records.maxlen:
+            self.tree.takeTopLevelItem(self.tree.topLevelItemCount() - 1)
+        if self.tree.topLevelItemCount() == 1:
+            self.tree.resizeColumnToContents(0)
+
+    def clear(self):
+        self.tracer.records.clear()
+        self.tree.clear()
@@ -0,0 +1,130 @@
+import json
+import os
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+TRACE_VARIABLE = "JSON_SCHEMA_EDITOR_TRACE"  # "1", or "memory" with allocations
+LOG_BYTES = 1024 * 1024  # of a log file before it's rotated
+LOG_BACKUPS = 3
+NO_TRACE = nullcontext()
+
+
+class Tracer:
+    # Times the actions of the editor and the phases within them. Records go to
+    # the listeners and to a rotating log of JSON lines. While tracing is
+    # disabled, action() and phase() return a context manager which does nothing.
+    def __init__(self, capacity=100):
+        self.enabled = False
+        self.memory = False  # allocations traced by tracemalloc
+        self.records = deque(maxlen=capacity)  # the latest actions
+        self.listeners = []  # called with each record
+        self.path = None  # of the log, None if it cannot be written
+        self.log = None
+        self.phases = None  # of the running action
+        self.depth = 0
+
+    def enable(self, path=None, memory=False):
+        self.enabled = True
+        self.set_memory(memory)
+        if path is None or path == self.path:
+            return
+        import logging.handlers
+
+        self.log = logging.getLogger("json_schema_editor.trace")
+        self.log.propagate = False
+        self.log.setLevel(logging.INFO)
+        for handler in self.log.handlers[:]:
+            self.log.removeHandler(handler)
+            handler.close()
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            handler = logging.handlers.RotatingFileHandler(
+                path, maxBytes=LOG_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8")
+        except OSError:
+            self.path = self.log = None
+            return
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self.log.addHandler(handler)
+        self.path = path
+
+    def disable(self):
+        self.enabled = False
+        self.set_memory(False)
+
+    def set_memory(self, memory):
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif not memory and self.memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.memory = memory
+
+    def action(self, name, size=None):
+        # size is a function which returns the number of nodes of the schema. An
+        # action within another one is a phase of it.
+        if not self.enabled:
+            return NO_TRACE
+        if self.phases is not None:
+            return self._phase(name)
+        return self._action(name, size)
+
+    def phase(self, name):
+        if self.phases is None:
+            return NO_TRACE
+        return self._phase(name)
+
+    @contextmanager
+    def _action(self, name, size):
+        self.phases = []
+        self.depth = 0
+        memory = self.memory and tracemalloc.is_tracing()
+        if memory:
+            start = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        error = None
+        t = time.perf_counter()
+        try:
+            yield
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            duration = time.perf_counter() - t
+            record = {
+                "time": datetime.now().isoformat(timespec="milliseconds"),
+                "action": name,
+                "duration": duration,
+                "phases": self.phases,
+            }
+            if memory and tracemalloc.is_tracing():
+                record["allocated"] = tracemalloc.get_traced_memory()[1] - start
+            self.phases = None
+            if size is not None:
+                record["nodes"] = size()
+            if error is not None:
+                record["error"] = error
+            self.emit(record)
+
+    @contextmanager
+    def _phase(self, name):
+        phase = {"name": name, "depth": self.depth, "duration": 0.0}
+        self.phases.append(phase)
+        self.depth += 1
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            phase["duration"] = time.perf_counter() - t
+            self.depth -= 1
+
+    def emit(self, record):
+        self.records.append(record)
+        if self.log is not None:
+            self.log.info(json.dumps(record, ensure_ascii=False))
+        for listener in self.listeners:
+            listener(record)
+
+
+TRACER = Tracer()
@@ -0,0 +1,499 @@
+import codecs
+import json
+import re
+from collections import namedtuple
+from pathlib import Path
+from time import perf_counter
+
+import jsonschema
+
+WHITESPACE = re.compile(r"[ \t\r\n]*")
+# Draft 7 keywords of the root which look at the whole array beside items,
+# minItems and maxItems, so that the array cannot be validated element by element
+WHOLE_ARRAY_KEYWORDS = ("$ref", "enum", "const", "uniqueItems", "contains",
+                        "allOf", "anyOf", "oneOf", "not", "if")
+
+ErrorRecord = namedtuple(
+    "ErrorRecord", ["line", "path", "message", "keyword", "schema_path"])
+
+FileResult = namedtuple(
+    "FileResult", ["path", "valid", "n_errors", "first_error_path", "first_error"])
+
+
+class ValidatorCache:
+    # Keeps the validator of the latest schema revision and $ref registry
+    def __init__(self):
+        self.revision = None
+        self.registry = None
+        self.validator = None
+
+    def get(self, schema, revision, registry=None):
+        reused = self.validator is not None and self.revision == revision and \
+            self.registry is registry
+        if not reused:
+            self.validator = make_validator(schema, registry)
+            self.revision = revision
+            self.registry = registry
+        return self.validator, reused
+
+    def clear(self):
+        self.revision = None
+        self.registry = None
+        self.validator = None
+
+
+def make_validator(schema, registry=None):
+    if registry is None:  # the default registry of jsonschema
+        return jsonschema.Draft7Validator(schema)
+    return jsonschema.Draft7Validator(schema, registry=registry)
+
+
+def format_path(path, root="$"):
+    path_str = root
+    for p in path:
+        if isinstance(p, str):
+            p_ = "\"" + p + "\""
+        else:
+            p_ = str(p)
+        path_str += "[" + p_ + "]"
+    return path_str
+
+
+def check_schema(schema):
+    # Returns the error message, or None if the schema is valid
+    try:
+        jsonschema.Draft7Validator.check_schema(schema)
+    except jsonschema.exceptions.SchemaError as e:
+        return f"At {format_path(e.path, 'schema')}, {e.message}."
+    return None
+
+
+def shallow_subschema(schema):
+    # Subschemas of "properties" and "items" are replaced by empty schemas, so
+    # that only the keywords of this schema are checked
+    shallow = dict(schema)
+    if isinstance(schema.get("properties"), dict):
+        shallow["properties"] = {
+            k: {} if isinstance(v, dict) else v
+            for k, v in schema["properties"].items()
+        }
+    if isinstance(schema.get("items"), dict):
+        shallow["items"] = {}
+    return shallow
+
+
+def find_subschema(root, schema, path=()):
+    # Searches the location of a subschema by identity along properties and items
+    if root is schema:
+        return list(path)
+    if not isinstance(root, dict):
+        return None
+    for field, property_ in (root.get("properties") or {}).items():
+        found = find_subschema(property_, schema, (*path, "properties", field))
+        if found is not None:
+            return found
+    if isinstance(root.get("items"), dict):
+        return find_subschema(root["items"], schema, (*path, "items"))
+    return None
+
+
+def path_to_subschema(root, path):
+    p = root
+    try:
+        for key in path:
+            p = p[key]
+    except (KeyError, IndexError, TypeError):
+        return None
+    return p
+
+
+def iter_subschemas(schema, path=()):
+    # Subschemas along properties and items, with their paths
+    yield schema, list(path)
+    for field, property_ in (schema.get("properties") or {}).items():
+        if isinstance(property_, dict):
+            yield from iter_subschemas(property_, (*path, "properties", field))
+    if isinstance(schema.get("items"), dict):
+        yield from iter_subschemas(schema["items"], (*path, "items"))
+
+
+def subschema_error(shallow, path):
+    # Checks a copy made by shallow_subschema(), which can be done on any thread
+    try:
+        jsonschema.Draft7Validator.check_schema(shallow)
+    except jsonschema.exceptions.SchemaError as e:
+        return f"At {format_path([*path, *e.path], 'schema')}, {e.message}."
+    return None
+
+
+class SchemaChecker:
+    # Checks the whole schema once, and later only the subschemas changed since
+    # the last successful check. Unchanged subschemas are known to be valid.
+    def __init__(self):
+        self.checked_root = None
+        self.changed = {}  # id -> (subschema, path when it changed)
+
+    def mark_changed(self, schema, path):
+        self.changed[id(schema)] = (schema, path)
+
+    def pending(self, root):
+        # Changed subschemas still in the schema, with their current paths
+        for key, (schema, path) in list(self.changed.items()):
+            if path_to_subschema(root, path) is not schema:
+                path = find_subschema(root, schema)
+                if path is None:  # removed from the schema
+                    del self.changed[key]
+                    continue
+                self.changed[key] = (schema, path)
+            yield schema, path
+
+    def check(self, root):
+        # Returns the error message, or None if the schema is valid
+        if self.checked_root is not root:
+            message = check_schema(root)
+            if message is None:
+                self.checked_root = root
+                self.changed.clear()
+            return message
+        for schema, path in self.pending(root):
+            message = subschema_error(shallow_subschema(schema), path)
+            if message is not None:
+                return message
+            del self.changed[id(schema)]
+        return None
+
+    def jobs(self, root):
+        # Returns whether all subschemas are to be checked, and the subschemas
+        # with their paths and copies to check on a worker thread
+        full = self.checked_root is not root
+        subschemas = iter_subschemas(root) if full else self.pending(root)
+        return full, [
+            (schema, path, shallow_subschema(schema)) for schema, path in subschemas]
+
+    def update(self, root, full, results):
+        # results: (subschema, path, error message or None) of jobs()
+        if full:
+            self.checked_root = root
+            self.changed.clear()
+        for schema, path, message in results:
+            if message is None:
+                self.changed.pop(id(schema), None)
+            else:  # checked again at the next time
+                self.changed[id(schema)] = (schema, path)
+
+
+class ErrorReport:
+    # Errors of data, kept up to max_errors and grouped by the schema path and
+    # keyword. Paths are formatted only when they are shown.
+    def __init__(self, max_errors=None):
+        self.max_errors = max_errors
+        self.records = []
+        self.groups = {}  # (schema path, keyword) -> records
+        self.truncated = False
+
+    def extend(self, errors, line=None, path=(), schema_path=()):
+        # Consumes the errors lazily, and stops at the limit. path and
+        # schema_path are prefixed, for errors of an element of the root array.
+        for error in errors:
+            if self.max_errors is not None and len(self.records) >= self.max_errors:
+                self.truncated = True
+                return False
+            record = ErrorRecord(
+                line, (*path, *error.path), error.message, error.validator,
+                (*schema_path, *error.schema_path))
+            self.records.append(record)
+            key = (record.schema_path[:-1], record.keyword)
+            self.groups.setdefault(key, []).append(record)
+        return True
+
+
+def iter_schema_dicts(schema, pointer=""):
+    # Every dict in the schema with its JSON pointer, including subschemas under
+    # definitions and applicators such as allOf
+    stack = [(pointer, schema)]
+    while stack:
+        pointer, value = stack.pop()
+        if isinstance(value, dict):
+            yield pointer, value
+            children = value.items()
+        elif isinstance(value, list):
+            children = enumerate(value)
+        else:
+            continue
+        for key, child in children:
+            token = str(key).replace("~", "~0").replace("/", "~1")
+            stack.append((f"{pointer}/{token}", child))
+
+
+def first_keyword(schema):
+    # The first keyword which the validator checks, which runs once for each
+    # instance validated against the subschema. $ref overrides the others in
+    # draft 7.
+    keywords = ["$ref"] if "$ref" in schema.keys() else schema.keys()
+    for keyword in keywords:
+        if keyword in jsonschema.Draft7Validator.VALIDATORS:
+            return keyword
+    return None
+
+
+class CostProfile:
+    # Wall time and calls of the keywords of each subschema during validation.
+    # The time of a keyword includes the subschemas it descends into, and its
+    # self time doesn't. Subschemas of other files are counted together.
+    OTHER_FILES = "(other files)"
+
+    def __init__(self, schema):
+        self.schemas = {}  # id -> (JSON pointer, subschema, first keyword)
+        for pointer, subschema in iter_schema_dicts(schema):
+            self.schemas[id(subschema)] = (pointer, subschema, first_keyword(subschema))
+        self.costs = {}  # (pointer, keyword) -> [calls, time, self time]
+        self.evaluations = {}  # pointer -> instances validated against it
+        self.nested = [0.0]  # time of the keywords called by each running one
+
+    def _timed(self, keyword, function):
+        def timed(validator, value, instance, schema):
+            entry = self.schemas.get(id(schema))
+            if entry is None:  # kept, so that the id isn't reused
+                entry = self.schemas[id(schema)] = (
+                    self.OTHER_FILES, schema, first_keyword(schema))
+            pointer, _, first = entry
+            self.nested.append(0.0)
+            start = perf_counter()
+            try:
+                # Consumed here, so that the time of the caller between errors
+                # isn't counted
+                return list(function(validator, value, instance, schema) or ())
+            finally:
+                elapsed = perf_counter() - start
+                nested = self.nested.pop()
+                self.nested[-1] += elapsed
+                cost = self.costs.get((pointer, keyword))
+                if cost is None:
+                    cost = self.costs[(pointer, keyword)] = [0, 0.0, 0.0]
+                cost[0] += 1
+                cost[1] += elapsed
+                cost[2] += elapsed - nested
+                if keyword == first:
+                    self.evaluations[pointer] = self.evaluations.get(pointer, 0) + 1
+        return timed
+
+    def validator(self, schema, registry=None):
+        # A validator of the schema which records the costs here
+        cls = jsonschema.validators.extend(jsonschema.Draft7Validator, {
+            keyword: self._timed(keyword, function)
+            for keyword, function in jsonschema.Draft7Validator.VALIDATORS.items()
+        })
+        if registry is None:
+            return cls(schema)
+        return cls(schema, registry=registry)
+
+    def total(self):
+        # Time of the keywords which aren't called by other keywords
+        return sum(cost[2] for cost in self.costs.values())
+
+    def by_pointer(self):
+        # JSON pointer -> (instances, time, self time)
+        nodes = {}
+        for (pointer, _), (_, time, self_time) in self.costs.items():
+            node = nodes.setdefault(pointer, [self.evaluations.get(pointer, 0), 0.0, 0.0])
+            node[1] += time
+            node[2] += self_time
+        return {pointer: tuple(node) for pointer, node in nodes.items()}
+
+    def by_keyword(self):
+        # keyword -> (calls, self time). The time including nested keywords is
+        # left out, as recursive keywords would count it more than once.
+        keywords = {}
+        for (_, keyword), (calls, _, self_time) in self.costs.items():
+            entry = keywords.setdefault(keyword, [0, 0.0])
+            entry[0] += calls
+            entry[1] += self_time
+        return {keyword: tuple(entry) for keyword, entry in keywords.items()}
+
+
+def root_is_array(fp):
+    with open(fp, "rb") as f:
+        head = f.read(1024).lstrip(b"\xef\xbb\xbf \t\r\n")
+    return head.startswith(b"[")
+
+
+def find_files(directory, pattern="*.json"):
+    return sorted(str(p) for p in Path(directory).glob(pattern) if p.is_file())
+
+
+# Validator of the schema in a worker process of validate_files
+_worker_validator = None
+
+
+def _init_worker(schema_json, documents_json):
+    global _worker_validator
+    registry = None
+    if documents_json is not None:  # the registry cannot be pickled
+        from workspace import build_registry
+
+        registry = build_registry(json.loads(documents_json))
+    _worker_validator = make_validator(json.loads(schema_json), registry)
+
+
+def _validate_file(fp):
+    try:
+        with open(fp, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, UnicodeDecodeError, json.JSONDecodeError) as e:
+        return FileResult(fp, None, 0, "", f"Fail to open the data file: {e}")
+    n_errors = 0
+    first_error = None
+    for e in _worker_validator.iter_errors(data):
+        if first_error is None:
+            first_error = e
+        n_errors += 1
+    if first_error is None:
+        return FileResult(fp, True, 0, "", "")
+    return FileResult(fp, False, n_errors, format_path(first_error.path),
+                      first_error.message)
+
+
+def validate_files(schema, paths, max_workers=None, workspace=None):
+    # Results are yielded in the order they finish. Each worker process compiles
+    # the validator, and builds the registry of the workspace, once. Closing the
+    # generator cancels the files not started.
+    # Imported here to keep the start of the command line validator fast
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    schema_json = json.dumps(schema)
+    documents_json = None if workspace is None else json.dumps(workspace.documents)
+    executor = ProcessPoolExecutor(
+        max_workers=max_workers, initializer=_init_worker,
+        initargs=(schema_json, documents_json))
+    try:
+        futures = [executor.submit(_validate_file, fp) for fp in paths]
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_json_lines(f):
+    # f is a file opened in binary mode; yields (line number, record)
+    for line_no, line in enumerate(f, 1):
+        if line.strip():
+            yield line_no, json.loads(line)
+
+
+def iter_json_array(f, chunk_size=1 << 20):
+    # f is a file opened in binary mode whose root is an array; yields
+    # (index, element) while keeping at most one element and one chunk in memory
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buf = ""
+    pos = 0
+    eof = False
+    index = 0
+    state = "start"  # start, first value, value, separator
+    while True:
+        pos = WHITESPACE.match(buf, pos).end()
+        if pos == len(buf) and not eof:
+            chunk = f.read(max(chunk_size, len(buf) - pos))
+            eof = not chunk
+            buf = buf[pos:] + text_decoder.decode(chunk, final=eof)
+            pos = 0
+            continue
+        if pos == len(buf):
+            raise json.JSONDecodeError("Expecting value", buf, pos)
+        c = buf[pos]
+        if state == "start":
+            if c != "[":
+                raise json.JSONDecodeError("Root is not an array", buf, pos)
+            pos += 1
+            state = "first value"
+        elif state == "separator" or state == "first value" and c == "]":
+            if c == "]":
+                return
+            if c != ",":
+                raise json.JSONDecodeError("Expecting ',' delimiter", buf, pos)
+            pos += 1
+            state = "value"
+        else:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+                # A number at the end of the buffer may continue in the next chunk
+                truncated = not eof and (
+                    end == len(buf) or buf[end] not in " \t\r\n,]")
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                truncated = True
+            if truncated:
+                chunk = f.read(max(chunk_size, len(buf) - pos))
+                eof = not chunk
+                buf = buf[pos:] + text_decoder.decode(chunk, final=eof)
+                pos = 0
+                continue
+            yield index, value
+            index += 1
+            pos = end
+            state = "separator"
+
+
+def stream_blockers(schema):
+    # Returns the keywords of the schema which prevent validating a file whose
+    # root is an array element by element
+    if not isinstance(schema, dict):
+        return []
+    blockers = [k for k in WHOLE_ARRAY_KEYWORDS if k in schema.keys()]
+    if "items" in schema.keys() and not isinstance(schema["items"], (dict, bool)):
+        blockers.append("items")  # of the elements by position
+    return blockers
+
+
+def iter_stream_errors(validator, f, jsonl=False):
+    # Validates records of a JSON Lines file, or elements of a file whose root
+    # is an array, one at a time. Yields (position, errors) for each record,
+    # where the position is the line number or the index in the array, and
+    # (None, errors) for the errors of the root array at the end. The schema
+    # must have no stream_blockers for an array.
+    schema = validator.schema
+    if jsonl:
+        records = iter_json_lines(f)
+        record_validator = validator
+    else:
+        blockers = stream_blockers(schema)
+        if blockers:
+            raise ValueError(
+                f"{', '.join(blockers)} of the schema need the whole array.")
+        records = iter_json_array(f)
+        items = schema.get("items", {}) if isinstance(schema, dict) else {}
+        record_validator = validator.evolve(
+            schema=items if isinstance(items, (dict, bool)) else {})
+    n_records = 0
+    for position, record in records:
+        n_records += 1
+        yield position, list(record_validator.iter_errors(record))
+    if jsonl:
+        return
+    # The other keywords of the root, such as type, don't look at the elements,
+    # so they are checked on an empty array
+    if isinstance(schema, dict):
+        root = {k: v for k, v in schema.items()
+                if k not in ("items", "minItems", "maxItems")}
+    else:
+        root = schema
+    errors = list(validator.evolve(schema=root).iter_errors([]))
+    for error in errors:
+        if error.message.startswith("[] "):
+            error.message = "the array " + error.message[3:]
+    if not isinstance(schema, dict):
+        if errors:
+            yield None, errors
+        return
+    # Array keywords which can be checked by the number of elements only
+    if n_records < schema.get("minItems", 0):
+        errors.append(jsonschema.ValidationError(
+            f"the array has {n_records} elements, fewer than minItems "
+            f"{schema['minItems']}", validator="minItems"))
+    if n_records > schema.get("maxItems", n_records):
+        errors.append(jsonschema.ValidationError(
+            f"the array has {n_records} elements, more than maxItems "
+            f"{schema['maxItems']}", validator="maxItems"))
+    if errors:
+        yield None, errors
@@ -0,0 +1,73 @@
+import json
+from pathlib import Path
+from urllib.parse import urldefrag, urljoin
+
+from referencing import Registry, Resource
+from referencing.exceptions import Unresolvable
+from referencing.jsonschema import DRAFT7
+
+from validation import find_files
+
+
+def build_registry(documents):
+    # documents: (URIs, contents) of each schema file. Subschemas with $id and
+    # anchors are indexed once here instead of on every lookup.
+    resources = []
+    for uris, contents in documents:
+        resource = Resource.from_contents(contents, default_specification=DRAFT7)
+        resources.extend((uri, resource) for uri in uris)
+    return Registry().with_resources(resources).crawl()
+
+
+class Workspace:
+    # Schemas of a directory in one registry, so that $ref across files is
+    # resolved without reading the files again. A file is registered by its path
+    # relative to the directory, its file URI and its $id.
+    def __init__(self, directory, pattern="**/*.json"):
+        self.directory = Path(directory).resolve()
+        self.pattern = pattern
+        self.documents = []  # (URIs, contents), to build the registry elsewhere
+        self.errors = []  # (path, message) of the files which cannot be loaded
+        for path in find_files(self.directory, pattern):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    contents = json.load(f)
+            except (OSError, UnicodeDecodeError, json.JSONDecodeError) as e:
+                self.errors.append((path, str(e)))
+                continue
+            uris = [self.base_uri(path), Path(path).resolve().as_uri()]
+            if isinstance(contents, dict) and isinstance(contents.get("$id"), str):
+                uris.append(contents["$id"])
+            self.documents.append((uris, contents))
+        self.registry = build_registry(self.documents)
+        self.resolved = {}  # (base URI, $ref) -> resolve()
+
+    def base_uri(self, path):
+        # URI which the relative $ref of the file are resolved against
+        path = Path(path).resolve()
+        try:
+            return path.relative_to(self.directory).as_posix()
+        except ValueError:
+            return path.as_uri()
+
+    def document(self, schema, path):
+        # The schema to validate with the registry. A schema without $id gets
+        # the URI of its file in a shallow copy.
+        if not path or not isinstance(schema, dict) or "$id" in schema.keys():
+            return schema
+        return {"$id": self.base_uri(path), **schema}
+
+    def resolve(self, ref, base_uri=""):
+        # Returns the referenced subschema, which isn't copied, and the URI of
+        # its document, or None if it isn't in the workspace. The saved version
+        # of a file is used, and lookups are memoised.
+        key = (base_uri, ref)
+        if key not in self.resolved:
+            try:
+                contents = self.registry.resolver(base_uri).lookup(ref).contents
+            except Unresolvable:
+                self.resolved[key] = None
+            else:
+                uri = urldefrag(urljoin(base_uri, ref)).url
+                self.resolved[key] = (contents, uri)
+        return self.resolved[key]